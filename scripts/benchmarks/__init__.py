@@ -0,0 +1 @@
+"""Benchmark scripts for model serving and data processing."""
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SRC_PATH = PROJECT_ROOT / "src"
+for path in (SRC_PATH, PROJECT_ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from config.logging import configure_logging, log  # noqa: E402
+
+
+def _memory_kb() -> dict:
+    status = Path("/proc/self/status")
+    if not status.exists():
+        return {}
+    values = {}
+    for line in status.read_text().splitlines():
+        key, _, rest = line.partition(":")
+        if key in {"VmRSS", "RssAnon", "RssFile"}:
+            values[key] = int(rest.split()[0])
+    return values
+
+
+def _worker(model_path: str, mmap_mode: str | None, ready, results) -> None:
+    import sklearn.ensemble  # noqa: F401
+    import sklearn.linear_model  # noqa: F401
+    import sklearn.pipeline  # noqa: F401
+
+    from api.model_store import load_model
+
+    start = time.perf_counter()
+    load_model(Path(model_path), mmap_mode=mmap_mode)
+    elapsed = time.perf_counter() - start
+    results.put({"load_s": elapsed, **_memory_kb()})
+    ready.wait()
+
+
+def _measure(model_path: Path, workers: int, mmap_mode: str | None) -> dict:
+    ctx = mp.get_context("spawn")
+    ready = ctx.Event()
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(str(model_path), mmap_mode, ready, results))
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    samples = [results.get(timeout=300) for _ in procs]
+    ready.set()
+    for proc in procs:
+        proc.join()
+
+    summary = {"load_s_mean": statistics.mean(sample["load_s"] for sample in samples)}
+    for key in ("VmRSS", "RssAnon", "RssFile"):
+        if all(key in sample for sample in samples):
+            summary[f"{key}_mb_mean"] = statistics.mean(s[key] for s in samples) / 1024
+    return summary
+
+
+def _train_synthetic(model_path: Path, rows: int, random_state: int) -> None:
+    import joblib
+
+    from scripts.benchmarks.bench_predict import FEATURES, _build_models, _synthetic_data
+
+    X, y = _synthetic_data(rows, random_state)
+    model = _build_models(random_state)["random_forest"]
+    model.fit(X, y)
+    joblib.dump({"model": model, "features": FEATURES, "mmap_compatible": True}, model_path)
+
+
+def run_benchmark(model_path: Path | None, workers: int, rows: int, random_state: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if model_path is None:
+            model_path = Path(tmp_dir) / "model.joblib"
+            _train_synthetic(model_path, rows, random_state)
+        results = {
+            "model_path": str(model_path),
+            "model_mb": model_path.stat().st_size / 1024 / 1024,
+            "workers": workers,
+            "in_memory": _measure(model_path, workers, None),
+            "mmap": _measure(model_path, workers, "r"),
+        }
+    for mode in ("in_memory", "mmap"):
+        log.info("{}: {}", mode, results[mode])
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark worker cold start and RSS with and without mmap model loading"
+    )
+    parser.add_argument("--model", type=Path, help="Model bundle (default: synthetic forest)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes to spawn")
+    parser.add_argument("--rows", type=int, default=20000, help="Synthetic training rows")
+    parser.add_argument("--random-state", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", type=Path, help="Optional JSON output path")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    configure_logging()
+    args = parse_args(argv)
+    results = run_benchmark(args.model, args.workers, args.rows, args.random_state)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+        log.info("Saved benchmark results to {}", args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(log.catch(main)())
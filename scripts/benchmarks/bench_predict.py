@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from api.inference import CompiledPredictor  # noqa: E402
+from config.logging import configure_logging, log  # noqa: E402
+
+FEATURES = [
+    "trip_distance",
+    "passenger_count",
+    "pickup_hour",
+    "pickup_weekday",
+    "pickup_is_weekend",
+    "is_rush_hour",
+    "speed_mph",
+    "PULocationID",
+    "DOLocationID",
+    "is_airport_pickup",
+    "is_airport_dropoff",
+]
+
+
+def _synthetic_data(rows: int, seed: int) -> tuple[pd.DataFrame, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        {
+            "trip_distance": rng.uniform(0.1, 20.0, rows),
+            "passenger_count": rng.integers(1, 5, rows).astype(float),
+            "pickup_hour": rng.integers(0, 24, rows).astype(float),
+            "pickup_weekday": rng.integers(0, 7, rows).astype(float),
+            "pickup_is_weekend": rng.integers(0, 2, rows).astype(float),
+            "is_rush_hour": rng.integers(0, 2, rows).astype(float),
+            "speed_mph": rng.uniform(2.0, 40.0, rows),
+            "PULocationID": rng.integers(1, 266, rows).astype(float),
+            "DOLocationID": rng.integers(1, 266, rows).astype(float),
+            "is_airport_pickup": rng.integers(0, 2, rows).astype(float),
+            "is_airport_dropoff": rng.integers(0, 2, rows).astype(float),
+        }
+    )
+    y = X["trip_distance"].to_numpy() / X["speed_mph"].to_numpy() * 3600
+    return X[FEATURES], y
+
+
+def _build_models(random_state: int) -> dict:
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.linear_model import ElasticNet
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    return {
+        "elastic_net": Pipeline(
+            [
+                ("scaler", StandardScaler()),
+                ("model", ElasticNet(alpha=0.1, l1_ratio=0.5, random_state=random_state)),
+            ]
+        ),
+        "random_forest": Pipeline(
+            [
+                (
+                    "model",
+                    RandomForestRegressor(
+                        n_estimators=50, max_depth=12, random_state=random_state, n_jobs=1
+                    ),
+                )
+            ]
+        ),
+    }
+
+
+def _percentiles(samples: list[float]) -> dict:
+    values = np.asarray(samples) * 1e6
+    return {
+        "p50_us": float(np.percentile(values, 50)),
+        "p99_us": float(np.percentile(values, 99)),
+        "mean_us": float(values.mean()),
+    }
+
+
+def _time_calls(fn, rows: list[dict], iterations: int) -> list[float]:
+    timings = []
+    for idx in range(iterations):
+        row = rows[idx % len(rows)]
+        start = time.perf_counter()
+        fn(row)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmark(iterations: int = 2000, rows: int = 5000, random_state: int = 42) -> dict:
+    X, y = _synthetic_data(rows, random_state)
+    payloads = X.head(256).to_dict(orient="records")
+    results: dict[str, dict] = {}
+    for name, model in _build_models(random_state).items():
+        model.fit(X, y)
+        predictor = CompiledPredictor(model, FEATURES)
+
+        def pandas_path(row: dict, model=model) -> float:
+            frame = pd.DataFrame([{feature: row[feature] for feature in FEATURES}])
+            return float(model.predict(frame)[0])
+
+        for fn in (pandas_path, predictor.predict_one):
+            _time_calls(fn, payloads, min(iterations, 100))
+
+        pandas_stats = _percentiles(_time_calls(pandas_path, payloads, iterations))
+        compiled_stats = _percentiles(_time_calls(predictor.predict_one, payloads, iterations))
+        results[name] = {
+            "pandas": pandas_stats,
+            "compiled": compiled_stats,
+            "p50_speedup": pandas_stats["p50_us"] / compiled_stats["p50_us"],
+            "p99_speedup": pandas_stats["p99_us"] / compiled_stats["p99_us"],
+        }
+        log.info(
+            "{}: pandas p50={:.1f}us p99={:.1f}us | compiled p50={:.1f}us p99={:.1f}us",
+            name,
+            pandas_stats["p50_us"],
+            pandas_stats["p99_us"],
+            compiled_stats["p50_us"],
+            compiled_stats["p99_us"],
+        )
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark single-row inference: pandas vs compiled NumPy path"
+    )
+    parser.add_argument("--iterations", type=int, default=2000, help="Timed calls per path")
+    parser.add_argument("--rows", type=int, default=5000, help="Synthetic training rows")
+    parser.add_argument("--random-state", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", type=Path, help="Optional JSON output path")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    configure_logging()
+    args = parse_args(argv)
+    results = run_benchmark(args.iterations, args.rows, args.random_state)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+        log.info("Saved benchmark results to {}", args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(log.catch(main)())
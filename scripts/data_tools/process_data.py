@@ -2,10 +2,17 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import itertools
+import json
+import shutil
 import sys
-from collections.abc import Iterable
+import tempfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -15,8 +22,169 @@ if str(SRC_PATH) not in sys.path:
 
 from config.logging import configure_logging, log  # noqa: E402
 
+ENGINES = ("pandas", "duckdb")
+SAMPLE_SEED = 42
+AIRPORT_LOCATIONS = [132, 138, 161]
+RUSH_HOURS = [7, 8, 9, 17, 18, 19]
+RANGE_FILTERS = {
+    "passenger_count": (1, 8),
+    "trip_distance": (0.01, 100),
+    "fare_amount": (0.01, 1000),
+}
+DURATION_RANGE = (30, 10800)
+DATETIME_COLUMNS = ["tpep_pickup_datetime", "tpep_dropoff_datetime"]
+LOCATION_COLUMNS = ["PULocationID", "DOLocationID"]
+MANIFEST_NAME = "manifest.json"
+CSV_CHUNK_ROWS = 1_000_000
+# Explicit types for every CSV read (in-memory, sampled and chunked): each chunk gets the
+# same schema instead of per-chunk inference (int vs float depending on NULLs).
+CSV_COLUMN_TYPES = {
+    "passenger_count": "Int64",
+    "trip_distance": "float64",
+    "fare_amount": "float64",
+    "PULocationID": "Int64",
+    "DOLocationID": "Int64",
+}
+# Zone IDs are integers once rows with NULLs are dropped, whatever the input dtype.
+LOCATION_DTYPE = "int64"
+OUTPUT_FORMATS = ("csv", "parquet", "dataset")
+# Carried alongside the features for hive partitioning; never written as data columns.
+PARTITION_COLUMNS = ["pickup_year", "pickup_month"]
+DATASET_ROW_GROUP_ROWS = 256 * 1024
+# Every raw column the cleaning/feature steps read; nothing else is loaded.
+RAW_COLUMNS = [*DATETIME_COLUMNS, *RANGE_FILTERS, *LOCATION_COLUMNS]
+# --compact output schema: 0/1 flags, hours, weekdays and counts fit in a byte, TLC zone IDs
+# (< 300) in two; continuous values are computed in float64 and stored as float32.
+COMPACT_DTYPES = {
+    "passenger_count": "uint8",
+    "pickup_hour": "uint8",
+    "pickup_weekday": "uint8",
+    "pickup_is_weekend": "uint8",
+    "is_rush_hour": "uint8",
+    "is_airport_pickup": "uint8",
+    "is_airport_dropoff": "uint8",
+    "PULocationID": "uint16",
+    "DOLocationID": "uint16",
+    "pickup_year": "uint16",
+    "pickup_month": "uint8",
+    "trip_distance": "float32",
+    "speed_mph": "float32",
+    "trip_duration": "float32",
+}
+_DUCKDB_TYPES = {
+    "uint8": "UTINYINT",
+    "uint16": "USMALLINT",
+    "int64": "BIGINT",
+    "float32": "FLOAT",
+}
+FEATURE_COLUMNS = [
+    "trip_distance",
+    "passenger_count",
+    "pickup_hour",
+    "pickup_weekday",
+    "pickup_is_weekend",
+    "is_rush_hour",
+    "speed_mph",
+    "PULocationID",
+    "DOLocationID",
+    "is_airport_pickup",
+    "is_airport_dropoff",
+]
 
-def _load_files(files: Iterable[Path], fmt: str) -> pd.DataFrame:
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _scan_filters(columns: Iterable[str]) -> list[str]:
+    columns = set(columns)
+    return [
+        f"{_quote(column)} BETWEEN {low} AND {high}"
+        for column, (low, high) in RANGE_FILTERS.items()
+        if column in columns
+    ]
+
+
+def _parquet_columns(conn, paths: list[str]) -> list[str]:
+    described = conn.execute(
+        "SELECT column_name FROM (DESCRIBE SELECT * FROM read_parquet(?, union_by_name=true))",
+        [paths],
+    ).fetchall()
+    return [name for (name,) in described]
+
+
+def _bytes_read() -> int | None:
+    # Process-wide read counter (Linux); covers DuckDB's reader threads too.
+    try:
+        with open("/proc/self/io") as handle:
+            for line in handle:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> None:
+    # Linux: writing 5 to clear_refs resets VmHWM, so the peak covers this run only.
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+    except OSError:
+        pass
+
+
+def _rss_mb(field: str) -> float | None:
+    try:
+        with open("/proc/self/status") as handle:
+            for line in handle:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _memory_report(baseline_mb: float | None, rows: int) -> dict:
+    peak_mb = _rss_mb("VmHWM")
+    if peak_mb is None or baseline_mb is None:
+        return {"peak_rss_mb": peak_mb, "baseline_rss_mb": baseline_mb, "mb_per_million_rows": None}
+    return {
+        "peak_rss_mb": round(peak_mb, 1),
+        "baseline_rss_mb": round(baseline_mb, 1),
+        "mb_per_million_rows": round((peak_mb - baseline_mb) / rows * 1e6, 1) if rows else None,
+    }
+
+
+def _compact_raw(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink a freshly loaded file before it is concatenated with the others."""
+    for column in DATETIME_COLUMNS:
+        if column in df.columns and df[column].dtype == object:
+            df[column] = pd.to_datetime(df[column])
+    for column in LOCATION_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("UInt16" if df[column].isna().any() else "uint16")
+    if "passenger_count" in df.columns:
+        df["passenger_count"] = df["passenger_count"].astype("float32")
+    return df
+
+
+def _read_csv(path: Path, **kwargs):
+    """``pd.read_csv`` of the raw columns with fixed dtypes; ``kwargs`` (e.g. chunksize) pass through."""
+    header = pd.read_csv(path, nrows=0).columns
+    return pd.read_csv(
+        path,
+        usecols=[col for col in RAW_COLUMNS if col in header],
+        dtype={col: dtype for col, dtype in CSV_COLUMN_TYPES.items() if col in header},
+        parse_dates=[col for col in DATETIME_COLUMNS if col in header],
+        date_format="ISO8601",
+        **kwargs,
+    )
+
+
+def _load_files(
+    files: Iterable[Path], fmt: str, push_filters: bool = False, compact: bool = False
+) -> pd.DataFrame:
     frames: list[pd.DataFrame] = []
     files = list(files)
     log.debug("Loading {} files with format={}", len(files), fmt)
@@ -25,17 +193,26 @@ def _load_files(files: Iterable[Path], fmt: str) -> pd.DataFrame:
             import duckdb
 
             with duckdb.connect() as conn:
-                frames.append(conn.execute("SELECT * FROM read_parquet(?)", [str(path)]).df())
+                available = _parquet_columns(conn, [str(path)])
+                columns = [col for col in RAW_COLUMNS if col in available]
+                filters = _scan_filters(columns) if push_filters else []
+                query = (
+                    f"SELECT {', '.join(_quote(col) for col in columns)} FROM read_parquet(?)"
+                    + (f" WHERE {' AND '.join(filters)}" if filters else "")
+                )
+                frames.append(conn.execute(query, [str(path)]).df())
         elif fmt == "csv":
-            frames.append(pd.read_csv(path))
+            frames.append(_read_csv(path))
         else:
             raise ValueError(f"Unsupported input format: {fmt}")
+        if compact:
+            frames[-1] = _compact_raw(frames[-1])
     if not frames:
         raise ValueError("No input files found.")
     return pd.concat(frames, ignore_index=True)
 
 
-def _clean_data(df: pd.DataFrame) -> pd.DataFrame:
+def _clean_data(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
     log.debug("Cleaning data with {} rows", len(df))
     if "tpep_pickup_datetime" in df.columns and "tpep_dropoff_datetime" in df.columns:
         df["tpep_pickup_datetime"] = pd.to_datetime(df["tpep_pickup_datetime"])
@@ -43,94 +220,585 @@ def _clean_data(df: pd.DataFrame) -> pd.DataFrame:
         df["trip_duration"] = (
             df["tpep_dropoff_datetime"] - df["tpep_pickup_datetime"]
         ).dt.total_seconds()
+        if compact:
+            del df["tpep_dropoff_datetime"]
     else:
         raise ValueError("Missing pickup/dropoff datetime columns.")
 
-    if "passenger_count" in df.columns:
-        before = len(df)
-        df = df[df["passenger_count"].between(1, 8)]
-        log.debug("Filter passenger_count: {} -> {}", before, len(df))
-    if "trip_distance" in df.columns:
-        before = len(df)
-        df = df[df["trip_distance"].between(0.01, 100)]
-        log.debug("Filter trip_distance: {} -> {}", before, len(df))
-    if "fare_amount" in df.columns:
-        before = len(df)
-        df = df[df["fare_amount"].between(0.01, 1000)]
-        log.debug("Filter fare_amount: {} -> {}", before, len(df))
-    if "trip_duration" in df.columns:
-        before = len(df)
-        df = df[df["trip_duration"].between(30, 10800)]
-        log.debug("Filter trip_duration: {} -> {}", before, len(df))
+    for column, (low, high) in [*RANGE_FILTERS.items(), ("trip_duration", DURATION_RANGE)]:
+        if column in df.columns:
+            before = len(df)
+            df = df[df[column].between(low, high)]
+            log.debug("Filter {}: {} -> {}", column, before, len(df))
+    if compact and "fare_amount" in df.columns:
+        # Only used by the range filter above.
+        del df["fare_amount"]
     return df
 
 
-def _engineer_features(df: pd.DataFrame) -> pd.DataFrame:
+def _engineer_features(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
     log.debug("Engineering features for {} rows", len(df))
-    df["pickup_hour"] = df["tpep_pickup_datetime"].dt.hour
-    df["pickup_weekday"] = df["tpep_pickup_datetime"].dt.weekday
-    df["pickup_is_weekend"] = (df["pickup_weekday"] >= 5).astype(int)
+    pickup = df["tpep_pickup_datetime"].dt
+    parts = {
+        "pickup_year": pickup.year,
+        "pickup_month": pickup.month,
+        "pickup_hour": pickup.hour,
+        "pickup_weekday": pickup.weekday,
+    }
+    for column, values in parts.items():
+        df[column] = values.astype(COMPACT_DTYPES[column]) if compact else values
+    flag = "uint8" if compact else int
+    df["pickup_is_weekend"] = (df["pickup_weekday"] >= 5).astype(flag)
 
-    df["hour_category"] = pd.cut(
-        df["pickup_hour"],
-        bins=[0, 6, 12, 18, 24],
-        labels=["Night", "Morning", "Afternoon", "Evening"],
-        include_lowest=True,
-    )
+    if compact:
+        # Everything below is derived from the parts above; the categories are never selected.
+        del df["tpep_pickup_datetime"]
+    else:
+        df["hour_category"] = pd.cut(
+            df["pickup_hour"],
+            bins=[0, 6, 12, 18, 24],
+            labels=["Night", "Morning", "Afternoon", "Evening"],
+            include_lowest=True,
+        )
 
-    df["distance_category"] = pd.cut(
-        df["trip_distance"],
-        bins=[0, 2, 5, 10, float("inf")],
-        labels=["Short", "Medium", "Long", "Very_Long"],
-        include_lowest=True,
-    )
+        df["distance_category"] = pd.cut(
+            df["trip_distance"],
+            bins=[0, 2, 5, 10, float("inf")],
+            labels=["Short", "Medium", "Long", "Very_Long"],
+            include_lowest=True,
+        )
 
     df["speed_mph"] = (df["trip_distance"] / (df["trip_duration"] / 3600)).round(2)
     df["speed_mph"] = df["speed_mph"].clip(0, 100)
 
     if "PULocationID" in df.columns:
-        airport_locations = [132, 138, 161]
-        df["is_airport_pickup"] = df["PULocationID"].isin(airport_locations).astype(int)
+        df["is_airport_pickup"] = df["PULocationID"].isin(AIRPORT_LOCATIONS).astype(flag)
     if "DOLocationID" in df.columns:
-        airport_locations = [132, 138, 161]
-        df["is_airport_dropoff"] = df["DOLocationID"].isin(airport_locations).astype(int)
+        df["is_airport_dropoff"] = df["DOLocationID"].isin(AIRPORT_LOCATIONS).astype(flag)
 
-    rush_hours = [7, 8, 9, 17, 18, 19]
-    df["is_rush_hour"] = df["pickup_hour"].isin(rush_hours).astype(int)
+    df["is_rush_hour"] = df["pickup_hour"].isin(RUSH_HOURS).astype(flag)
     return df
 
 
-def _select_features(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
-    feature_columns = [
-        "trip_distance",
-        "passenger_count",
-        "pickup_hour",
-        "pickup_weekday",
-        "pickup_is_weekend",
-        "is_rush_hour",
-        "speed_mph",
-        "PULocationID",
-        "DOLocationID",
-        "is_airport_pickup",
-        "is_airport_dropoff",
-    ]
-
-    feature_columns = [col for col in feature_columns if col in df.columns]
-    model_df = df[feature_columns + ["trip_duration"]].copy()
-    model_df = model_df.dropna()
+def _select_features(df: pd.DataFrame, compact: bool = False) -> tuple[pd.DataFrame, list[str]]:
+    feature_columns = [col for col in FEATURE_COLUMNS if col in df.columns]
+    model_df = df[[*feature_columns, "trip_duration", *PARTITION_COLUMNS]]
+    if compact:
+        model_df = model_df.dropna()
+        model_df = model_df.astype(
+            {col: COMPACT_DTYPES[col] for col in model_df.columns if col in COMPACT_DTYPES}
+        )
+    else:
+        model_df = model_df.copy().dropna()
+        # No NULLs are left, so nullable integers (e.g. from CSV) go back to plain NumPy ints,
+        # as DuckDB returns them; the output dtype does not depend on NULLs in the input.
+        dtypes = {
+            col: dtype.numpy_dtype
+            for col, dtype in model_df.dtypes.items()
+            if isinstance(dtype, pd.api.extensions.ExtensionDtype)
+            and pd.api.types.is_integer_dtype(dtype)
+        }
+        dtypes.update({col: LOCATION_DTYPE for col in LOCATION_COLUMNS if col in model_df.columns})
+        model_df = model_df.astype(dtypes)
     log.debug("Selected {} features for {} rows", len(feature_columns), len(model_df))
     return model_df, feature_columns
 
 
-def _write_outputs(df: pd.DataFrame, features: list[str], output_dir: Path, fmt: str) -> None:
-    output_dir.mkdir(parents=True, exist_ok=True)
-    data_path = output_dir / f"processed_data.{fmt}"
-    if fmt == "parquet":
-        df.to_parquet(data_path, index=False)
-    elif fmt == "csv":
-        df.to_csv(data_path, index=False)
+def _duckdb_source(
+    conn, files: list[Path], fmt: str, sample: pd.DataFrame | None, compact: bool = False
+) -> list[str]:
+    """Expose the raw rows as view ``raw``; returns the columns giving pandas' row order.
+
+    Multi-threaded scans do not keep input order, so the feature query sorts on these.
+    """
+    if sample is not None or fmt == "csv":
+        # Samples are read by the same scan-time reader as the pandas engine, and CSV
+        # parsing stays in pandas, so both engines see the same rows and dtypes.
+        df = sample if sample is not None else _load_files(files, fmt, compact=compact)
+        for column in DATETIME_COLUMNS:
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column])
+        df["row_order"] = np.arange(len(df))
+        conn.register("raw", df)
+        return ["row_order"]
+    if fmt != "parquet":
+        raise ValueError(f"Unsupported input format: {fmt}")
+
+    paths = [str(path) for path in files]
+    columns = ", ".join(_quote(col) for col in RAW_COLUMNS if col in _parquet_columns(conn, paths))
+    source = conn.read_parquet(paths, union_by_name=True)
+    filters = _scan_filters(source.columns)
+    scan = conn.read_parquet(paths, union_by_name=True, filename=True, file_row_number=True)
+    file_list = "[" + ", ".join("'" + path.replace("'", "''") + "'" for path in paths) + "]"
+    scan = scan.project(
+        f"{columns}, list_position({file_list}, filename) AS file_order, file_row_number"
+    )
+    if filters:
+        scan = scan.filter(" AND ".join(filters))
+    scan.create_view("raw")
+    return ["file_order", "file_row_number"]
+
+
+def _process_duckdb(
+    files: list[Path],
+    fmt: str,
+    sample_size: int | None,
+    threads: int | None = None,
+    compact: bool = False,
+) -> tuple[pd.DataFrame, list[str]]:
+    import duckdb
+
+    with duckdb.connect() as conn:
+        if threads:
+            conn.execute(f"SET threads = {int(threads)}")
+        sample = _sampled_raw(files, fmt, sample_size, compact)
+        order = _duckdb_source(conn, files, fmt, sample, compact)
+        types = dict(conn.execute("SELECT column_name, column_type FROM (DESCRIBE raw)").fetchall())
+        pickup, dropoff = "tpep_pickup_datetime", "tpep_dropoff_datetime"
+        if pickup not in types or dropoff not in types:
+            raise ValueError("Missing pickup/dropoff datetime columns.")
+
+        if types[pickup] == "TIMESTAMP_NS" or types[dropoff] == "TIMESTAMP_NS":
+            duration = f"(epoch_ns({dropoff}) - epoch_ns({pickup})) / 1e9"
+        else:
+            duration = f"date_diff('microsecond', {pickup}, {dropoff}) / 1e6"
+        filters = _scan_filters(types)
+        filters.append(f"trip_duration BETWEEN {DURATION_RANGE[0]} AND {DURATION_RANGE[1]}")
+
+        airports = ", ".join(str(location) for location in AIRPORT_LOCATIONS)
+        rush = ", ".join(str(hour) for hour in RUSH_HOURS)
+        derived = {
+            "pickup_year": f"year({pickup})::INTEGER",
+            "pickup_month": f"month({pickup})::INTEGER",
+            "pickup_hour": f"hour({pickup})::INTEGER",
+            "pickup_weekday": f"(isodow({pickup}) - 1)::INTEGER",
+            "pickup_is_weekend": f"(isodow({pickup}) >= 6)::BIGINT",
+            "is_rush_hour": f"(CASE WHEN hour({pickup}) IN ({rush}) THEN 1 ELSE 0 END)::BIGINT",
+            # numpy's round(2) is rint(x * 100) / 100, i.e. banker's rounding on x * 100.
+            "speed_mph": "least(greatest(roundbankers("
+            "trip_distance / (trip_duration / 3600) * 100, 0) / 100, 0), 100)",
+        }
+        for column, name in (
+            ("PULocationID", "is_airport_pickup"),
+            ("DOLocationID", "is_airport_dropoff"),
+        ):
+            if column in types:
+                derived[name] = f"(CASE WHEN {column} IN ({airports}) THEN 1 ELSE 0 END)::BIGINT"
+
+        features = [col for col in FEATURE_COLUMNS if col in types or col in derived]
+        selected = [*features, "trip_duration", *PARTITION_COLUMNS]
+        expressions = [
+            f"{derived[col]} AS {col}" if col in derived else _quote(col) for col in selected
+        ]
+        not_null = [f"{_quote(col)} IS NOT NULL" for col in selected]
+        not_null += [
+            f"NOT isnan({_quote(col)})" for col in selected if types.get(col) in {"FLOAT", "DOUBLE"}
+        ]
+        if compact:
+            casts = {col: _DUCKDB_TYPES[dtype] for col, dtype in COMPACT_DTYPES.items()}
+        else:
+            casts = {col: _DUCKDB_TYPES[LOCATION_DTYPE] for col in LOCATION_COLUMNS}
+        outputs = [
+            f"CAST({_quote(col)} AS {casts[col]}) AS {_quote(col)}" if col in casts else _quote(col)
+            for col in selected
+        ]
+        query = (
+            f"WITH cleaned AS (SELECT *, {duration} AS trip_duration FROM raw "
+            f"WHERE {' AND '.join(filters)}), "
+            f"featured AS (SELECT {', '.join(expressions)}"
+            f", {', '.join(order)} FROM cleaned) "
+            f"SELECT {', '.join(outputs)} FROM featured "
+            f"WHERE {' AND '.join(not_null)}"
+            f" ORDER BY {', '.join(order)}"
+        )
+        log.debug("DuckDB feature query: {}", query)
+        model_df = conn.execute(query).df()
+
+    log.debug("Selected {} features for {} rows", len(features), len(model_df))
+    return model_df, features
+
+
+def _count_rows(path: Path) -> int:
+    import duckdb
+
+    # Answered from the parquet footer; no data pages are read.
+    with duckdb.connect() as conn:
+        return conn.execute("SELECT count(*) FROM read_parquet(?)", [str(path)]).fetchone()[0]
+
+
+def _sample_quotas(counts: list[int], sample_size: int) -> list[int]:
+    # Proportional to each file's row count; leftover rows go to the largest remainders.
+    shares = np.asarray(counts, dtype=np.float64) * sample_size / sum(counts)
+    quotas = np.floor(shares).astype(np.int64)
+    leftover = sample_size - int(quotas.sum())
+    quotas[np.argsort(quotas - shares, kind="stable")[:leftover]] += 1
+    return quotas.tolist()
+
+
+def _sample_positions(
+    files: list[Path], fmt: str, sample_size: int | None
+) -> list[np.ndarray] | None:
+    """Sorted raw row positions to read from each parquet file, or None to read everything."""
+    if not sample_size:
+        return None
+    if fmt != "parquet":
+        raise ValueError(f"Row positions are only drawn for parquet input, not {fmt}")
+    counts = [_count_rows(path) for path in files]
+    if sample_size >= sum(counts):
+        return None
+    rng = np.random.RandomState(SAMPLE_SEED)
+    return [
+        np.sort(rng.choice(count, size=quota, replace=False))
+        for count, quota in zip(counts, _sample_quotas(counts, sample_size), strict=True)
+    ]
+
+
+def _read_rows(path: Path, rows: np.ndarray) -> pd.DataFrame:
+    import duckdb
+
+    # Only the projected columns are decoded, and only for the sampled rows. Row groups
+    # are skipped only when no sampled row falls in them, i.e. for very sparse samples.
+    with duckdb.connect() as conn:
+        available = _parquet_columns(conn, [str(path)])
+        columns = ", ".join(_quote(col) for col in RAW_COLUMNS if col in available)
+        conn.register("picks", pd.DataFrame({"file_row_number": rows}))
+        return conn.execute(
+            f"SELECT {columns} FROM read_parquet(?, file_row_number=true) "
+            "JOIN picks USING (file_row_number) ORDER BY file_row_number",
+            [str(path)],
+        ).df()
+
+
+def _load_sample(
+    files: list[Path], fmt: str, samples: list[np.ndarray], compact: bool = False
+) -> pd.DataFrame:
+    """Read only the sampled raw rows, file by file, instead of loading everything."""
+    log.debug("Sampling {} rows from {} files", sum(len(rows) for rows in samples), len(files))
+    frames = []
+    for path, rows in zip(files, samples, strict=True):
+        frame = _read_rows(path, rows)
+        frames.append(_compact_raw(frame) if compact else frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _csv_candidates(path: Path, file_order: int, sample_size: int) -> pd.DataFrame:
+    """One pass over a CSV file, keeping the ``sample_size`` rows with the smallest keys.
+
+    Every raw row gets a uniform key from a generator seeded by (seed, file position), so
+    the keys do not depend on which process reads the file.
+    """
+    rng = np.random.RandomState([SAMPLE_SEED, file_order])
+    kept, start = [], 0
+    with _read_csv(path, chunksize=CSV_CHUNK_ROWS) as reader:
+        for chunk in reader:
+            chunk.index = pd.RangeIndex(start, start + len(chunk), name="row_number")
+            chunk["sample_key"] = rng.random_sample(len(chunk))
+            start += len(chunk)
+            kept = [pd.concat([*kept, chunk]).nsmallest(sample_size, "sample_key")]
+    if not kept:
+        kept = [_read_csv(path, nrows=0).rename_axis("row_number").assign(sample_key=0.0)]
+    return kept[0].assign(file_order=file_order).reset_index()
+
+
+def _load_csv_sample(
+    files: list[Path], sample_size: int, compact: bool = False, workers: int = 1
+) -> pd.DataFrame:
+    """Uniform sample of ``sample_size`` raw rows over all CSV files, in one pass per file.
+
+    Counting CSV rows to split the sample into per-file quotas would already be a full
+    scan, so instead the rows with the globally smallest keys are kept (bottom-k sampling).
+    """
+    log.debug("Sampling {} rows from {} CSV files", sample_size, len(files))
+    jobs = [(path, order, sample_size) for order, path in enumerate(files)]
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+            futures = [pool.submit(_csv_candidates, *job) for job in jobs]
+            candidates = [future.result() for future in futures]
     else:
+        candidates = [_csv_candidates(*job) for job in jobs]
+    sample = (
+        pd.concat(candidates, ignore_index=True)
+        .nsmallest(sample_size, "sample_key")
+        .sort_values(["file_order", "row_number"])
+        .drop(columns=["sample_key", "file_order", "row_number"])
+        .reset_index(drop=True)
+    )
+    return _compact_raw(sample) if compact else sample
+
+
+def _sampled_raw(
+    files: list[Path], fmt: str, sample_size: int | None, compact: bool = False
+) -> pd.DataFrame | None:
+    """The sampled raw rows, in file order; None when nothing is sampled."""
+    if sample_size and fmt == "csv":
+        return _load_csv_sample(files, sample_size, compact)
+    samples = _sample_positions(files, fmt, sample_size)
+    return None if samples is None else _load_sample(files, fmt, samples, compact)
+
+
+def _csv_chunks(path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Raw CSV rows in frames of ``chunk_rows``, parsed exactly like the in-memory load."""
+    with _read_csv(path, chunksize=chunk_rows) as reader:
+        yield from reader
+
+
+def _stream_csv(
+    files: list[Path], chunk_rows: int, compact: bool, stats: dict
+) -> Iterator[pd.DataFrame]:
+    # Each chunk is cleaned and feature-engineered on its own; only one chunk (plus the
+    # writer's buffers) is resident at a time.
+    for path in files:
+        for chunk in _csv_chunks(path, chunk_rows):
+            stats["chunks"] += 1
+            if compact:
+                chunk = _compact_raw(chunk)
+            chunk = _clean_data(chunk, compact)
+            chunk = _engineer_features(chunk, compact)
+            model_df, _ = _select_features(chunk, compact)
+            yield model_df
+
+
+def _process_file(
+    path: Path,
+    fmt: str,
+    part_path: Path,
+    rows: np.ndarray | None,
+    engine: str = "pandas",
+    compact: bool = False,
+) -> Path:
+    # Worker: one raw file (or its sampled rows) through the pipeline, as a parquet part.
+    if engine == "duckdb":
+        model_df, _ = _process_duckdb([path], fmt, None, compact=compact)
+    else:
+        if rows is not None:
+            df = _load_sample([path], fmt, [rows], compact)
+        else:
+            df = _load_files([path], fmt, push_filters=True, compact=compact)
+        df = _clean_data(df, compact)
+        df = _engineer_features(df, compact)
+        model_df, _ = _select_features(df, compact)
+    part_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = part_path.with_name(f".{part_path.name}.tmp")
+    model_df.to_parquet(tmp_path)
+    tmp_path.replace(part_path)
+    return part_path
+
+
+def _build_parts(jobs: list[tuple], workers: int) -> list[Path]:
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [pool.submit(_process_file, *job) for job in jobs]
+            # Collected in job order, independent of which worker finished first.
+            return [future.result() for future in futures]
+    return [_process_file(*job) for job in jobs]
+
+
+def _combine_parts(parts: list[Path]) -> tuple[pd.DataFrame, list[str]]:
+    model_df = pd.concat([pd.read_parquet(part) for part in parts])
+    features = [col for col in FEATURE_COLUMNS if col in model_df.columns]
+    log.debug("Combined {} parts into {} rows", len(parts), len(model_df))
+    return model_df.reset_index(drop=True), features
+
+
+def _process_parallel(
+    files: list[Path],
+    fmt: str,
+    sample_size: int | None,
+    workers: int,
+    output_dir: Path,
+    compact: bool = False,
+) -> tuple[pd.DataFrame, list[str]]:
+    if sample_size and fmt == "csv":
+        # The CSV sample is drawn in one parallel pass over the files; the sample itself is
+        # small, so it is cleaned and feature-engineered here.
+        df = _load_csv_sample(files, sample_size, compact, workers)
+        df = _clean_data(df, compact)
+        df = _engineer_features(df, compact)
+        return _select_features(df, compact)
+    samples = _sample_positions(files, fmt, sample_size) or [None] * len(files)
+    # Scratch parts only: they may be sampled or compact, so they must never land in the
+    # incremental parts directory where a later --incremental run would reuse them.
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=output_dir, prefix=".parallel-parts-") as scratch:
+        jobs = [
+            (path, fmt, Path(scratch) / f"{path.stem}.parquet", rows, "pandas", compact)
+            for path, rows in zip(files, samples, strict=True)
+        ]
+        return _combine_parts(_build_parts(jobs, workers))
+
+
+def _code_version() -> str:
+    # Any change to this module (filters, features, dtypes) invalidates every partition.
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def _file_signature(path: Path) -> dict:
+    stat = path.stat()
+    return {"path": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _part_options(engine: str, compact: bool) -> dict:
+    # Everything that changes a part's contents; a mismatch makes the part stale.
+    return {
+        "code_version": _code_version(),
+        "engine": engine,
+        "compact": compact,
+        "sample_size": None,
+        "sample_seed": SAMPLE_SEED,
+    }
+
+
+def _process_incremental(
+    files: list[Path],
+    fmt: str,
+    engine: str,
+    workers: int,
+    parts_dir: Path,
+    compact: bool = False,
+) -> tuple[pd.DataFrame, list[str], dict]:
+    manifest_path = parts_dir / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    previous = manifest.get("files", {})
+    options = _part_options(engine, compact)
+
+    entries, stale = {}, []
+    for path in files:
+        signature = _file_signature(path)
+        part_path = parts_dir / f"{path.stem}.parquet"
+        entries[path.name] = {**signature, "part": part_path.name, "options": options}
+        if previous.get(path.name) != entries[path.name] or not part_path.exists():
+            stale.append(path)
+
+    removed = sorted(set(manifest.get("files", {})) - set(entries))
+    for name in removed:
+        (parts_dir / manifest["files"][name]["part"]).unlink(missing_ok=True)
+
+    jobs = [
+        (path, fmt, parts_dir / f"{path.stem}.parquet", None, engine, compact) for path in stale
+    ]
+    _build_parts(jobs, workers)
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps({"files": entries}, indent=2) + "\n")
+
+    model_df, features = _combine_parts([parts_dir / entries[p.name]["part"] for p in files])
+    report = {
+        "processed": [path.name for path in stale],
+        "reused": [path.name for path in files if path not in stale],
+        "removed": removed,
+    }
+    log.info(
+        "Incremental run: {} processed, {} reused, {} removed",
+        len(report["processed"]),
+        len(report["reused"]),
+        len(removed),
+    )
+    return model_df, features, report
+
+
+def _output_path(output_dir: Path, fmt: str) -> Path:
+    if fmt == "dataset":
+        return output_dir / "processed_data"
+    return output_dir / f"processed_data.{fmt}"
+
+
+def _write_dataset(frames: Iterable[pd.DataFrame], path: Path, partition_weekday: bool) -> None:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if path.exists():
+        shutil.rmtree(path)
+    keys = ["year", "month"]
+    if partition_weekday:
+        keys.append("weekday")
+
+    def tables():
+        for df in frames:
+            table = pa.Table.from_pandas(
+                df.rename(columns={"pickup_year": "year", "pickup_month": "month"}),
+                preserve_index=False,
+            )
+            if partition_weekday:
+                # A copy of pickup_weekday, so the feature itself stays in the files.
+                table = table.append_column("weekday", table["pickup_weekday"])
+            yield table
+
+    # One write for all frames (pulled lazily when streaming), so row groups fill up
+    # across chunks and every partition gets a single part file.
+    pending = tables()
+    first = next(pending, None)
+    if first is None:
+        return
+    batches = (
+        batch
+        for table in itertools.chain([first], pending)
+        for batch in table.cast(first.schema).to_batches()
+    )
+    ds.write_dataset(
+        batches,
+        path,
+        schema=first.schema,
+        format="parquet",
+        partitioning=ds.partitioning(first.select(keys).schema, flavor="hive"),
+        basename_template="part-{i}.parquet",
+        file_options=ds.ParquetFileFormat().make_write_options(
+            compression="zstd", write_statistics=True
+        ),
+        min_rows_per_group=DATASET_ROW_GROUP_ROWS,
+        max_rows_per_group=DATASET_ROW_GROUP_ROWS,
+        existing_data_behavior="overwrite_or_ignore",
+        preserve_order=True,
+    )
+
+
+def _write_frames(
+    frames: Iterable[pd.DataFrame], path: Path, fmt: str, partition_weekday: bool
+) -> tuple[int, list[str]]:
+    """Write one or many frames (e.g. streamed chunks) to ``path``; returns rows and columns."""
+    if fmt not in OUTPUT_FORMATS:
         raise ValueError(f"Unsupported output format: {fmt}")
+    written = {"rows": 0, "columns": []}
+
+    def tracked():
+        for df in frames:
+            written["rows"] += len(df)
+            written["columns"] = list(df.columns)
+            yield df
+
+    if fmt == "dataset":
+        _write_dataset(tracked(), path, partition_weekday)
+    elif fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for df in tracked():
+                table = pa.Table.from_pandas(
+                    df.drop(columns=PARTITION_COLUMNS), preserve_index=False
+                )
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        for idx, df in enumerate(tracked()):
+            df.drop(columns=PARTITION_COLUMNS).to_csv(
+                path, index=False, header=idx == 0, mode="w" if idx == 0 else "a"
+            )
+    return written["rows"], written["columns"]
+
+
+def _write_outputs(
+    frames: Iterable[pd.DataFrame],
+    output_dir: Path,
+    fmt: str,
+    partition_weekday: bool = False,
+) -> tuple[int, list[str]]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rows, columns = _write_frames(frames, _output_path(output_dir, fmt), fmt, partition_weekday)
+    features = [col for col in FEATURE_COLUMNS if col in columns]
 
     features_path = output_dir / "features.txt"
     features_path.write_text("\n".join(features) + "\n")
@@ -141,7 +809,7 @@ def _write_outputs(df: pd.DataFrame, features: list[str], output_dir: Path, fmt:
             [
                 "Dataset Summary",
                 "===============",
-                f"Total samples: {len(df)}",
+                f"Total samples: {rows}",
                 f"Features: {len(features)}",
                 "Target: trip_duration",
             ]
@@ -149,6 +817,7 @@ def _write_outputs(df: pd.DataFrame, features: list[str], output_dir: Path, fmt:
         + "\n"
     )
     log.info("Wrote processed data to {}", output_dir)
+    return rows, features
 
 
 def process_data(
@@ -157,9 +826,24 @@ def process_data(
     sample_size: int | None = None,
     input_format: str | None = None,
     output_format: str = "csv",
+    engine: str = "pandas",
+    workers: int = 1,
+    incremental: bool = False,
+    partition_weekday: bool = False,
+    compact: bool = False,
+    chunk_rows: int | None = None,
 ) -> dict:
-    parquet_files = list(input_dir.glob("*.parquet"))
-    csv_files = list(input_dir.glob("*.csv"))
+    if engine not in ENGINES:
+        raise ValueError(f"Unsupported engine: {engine}")
+    if incremental and sample_size:
+        raise ValueError("Incremental processing does not support sampling.")
+    if chunk_rows and (sample_size or incremental or engine != "pandas" or workers > 1):
+        raise ValueError(
+            "Chunked CSV ingest runs in one process with the pandas engine, without "
+            "sampling or incremental mode."
+        )
+    parquet_files = sorted(input_dir.glob("*.parquet"))
+    csv_files = sorted(input_dir.glob("*.csv"))
 
     if input_format:
         fmt = input_format
@@ -174,24 +858,74 @@ def process_data(
     if not files:
         log.warning("No input files found in {}", input_dir)
         raise FileNotFoundError(f"No input files found in {input_dir}")
+    if chunk_rows and fmt != "csv":
+        raise ValueError("Chunked ingest applies to CSV input only.")
 
-    df = _load_files(files, fmt)
-    if sample_size and sample_size < len(df):
-        df = df.sample(n=sample_size, random_state=42)
-        log.debug("Sampled {} records", sample_size)
+    file_bytes = sum(path.stat().st_size for path in files)
+    _reset_peak_rss()
+    baseline_mb = _rss_mb("VmRSS")
+    parallel = engine == "pandas" and workers > 1 and len(files) > 1
+    # /proc/self/io misses reads in worker processes and counts manifest/part reads, so
+    # the read count is only reported for single-process, non-incremental runs.
+    read_start = None if parallel or incremental else _bytes_read()
+    incremental_report = None
+    stream = None
+    if chunk_rows:
+        stream = {"chunk_rows": chunk_rows, "chunks": 0}
+        frames = _stream_csv(files, chunk_rows, compact, stream)
+    elif incremental:
+        model_df, _, incremental_report = _process_incremental(
+            files, fmt, engine, workers, output_dir / "parts", compact
+        )
+    elif engine == "duckdb":
+        # One query already scans all files in parallel; workers sizes DuckDB's thread pool.
+        model_df, _ = _process_duckdb(
+            files, fmt, sample_size, threads=workers if workers > 1 else None, compact=compact
+        )
+    elif parallel:
+        model_df, _ = _process_parallel(files, fmt, sample_size, workers, output_dir, compact)
+    else:
+        # Row filters can only be pushed into the scan when no raw-row sample is drawn.
+        df = _sampled_raw(files, fmt, sample_size, compact)
+        if df is None:
+            df = _load_files(files, fmt, push_filters=True, compact=compact)
 
-    df = _clean_data(df)
-    df = _engineer_features(df)
-    model_df, features = _select_features(df)
-    _write_outputs(model_df, features, output_dir, output_format)
+        df = _clean_data(df, compact)
+        df = _engineer_features(df, compact)
+        model_df, _ = _select_features(df, compact)
+        del df
+    if not chunk_rows:
+        frames = [model_df]
+        del model_df
+    # Streamed chunks are read while they are written, so reads are counted afterwards.
+    rows, features = _write_outputs(frames, output_dir, output_format, partition_weekday)
+    del frames
+    bytes_read = None if read_start is None else _bytes_read() - read_start
+    if bytes_read is not None:
+        log.info(
+            "Read {} of {} input bytes ({:.1%})",
+            bytes_read,
+            file_bytes,
+            bytes_read / file_bytes if file_bytes else 0.0,
+        )
+    memory = _memory_report(baseline_mb, rows)
+    log.info(
+        "Peak RSS {} MB ({} MB per million output rows over baseline)",
+        memory["peak_rss_mb"],
+        memory["mb_per_million_rows"],
+    )
 
     return {
-        "processed_path": str(output_dir / f"processed_data.{output_format}"),
+        "processed_path": str(_output_path(output_dir, output_format)),
         "features_path": str(output_dir / "features.txt"),
         "summary_path": str(output_dir / "data_summary.txt"),
-        "rows": int(len(model_df)),
+        "rows": int(rows),
         "features": features,
         "target": "trip_duration",
+        "scan": {"file_bytes": file_bytes, "bytes_read": bytes_read},
+        "incremental": incremental_report,
+        "memory": memory,
+        "stream": stream,
     }
 
 
@@ -221,9 +955,45 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     )
     parser.add_argument(
         "--output-format",
-        choices=["parquet", "csv"],
+        choices=OUTPUT_FORMATS,
         default="csv",
-        help="Output format for processed data",
+        help="Output format for processed data (dataset = hive-partitioned parquet by "
+        "pickup year/month)",
+    )
+    parser.add_argument(
+        "--partition-weekday",
+        action="store_true",
+        help="Also partition the parquet dataset by pickup weekday",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="pandas",
+        help="Run cleaning and feature engineering in pandas or as one DuckDB query",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Process raw files in N worker processes (pandas) or N DuckDB threads",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only reprocess new or changed raw files; reuse per-file partitions",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Use compact dtypes (uint8 flags/hours, uint16 zone IDs, float32 values) and "
+        "drop intermediate columns early",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=None,
+        help="Stream CSV input in chunks of N rows: each chunk is cleaned, feature-engineered "
+        "and appended to the output (bounded memory)",
     )
     return parser.parse_args(argv)
 
@@ -239,6 +1009,12 @@ def main(argv: list[str] | None = None) -> int:
             sample_size=args.sample_size,
             input_format=args.input_format,
             output_format=args.output_format,
+            engine=args.engine,
+            workers=args.workers,
+            incremental=args.incremental,
+            partition_weekday=args.partition_weekday,
+            compact=args.compact,
+            chunk_rows=args.chunk_rows,
         )
     except FileNotFoundError:
         return 1
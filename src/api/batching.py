@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from api.inference import LoadedModel
+from config.logging import log
+
+
+@dataclass
+class _Pending:
+    model: LoadedModel
+    row: np.ndarray
+    future: Future = field(default_factory=Future)
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        submit: Callable[[LoadedModel, np.ndarray], Future] | None = None,
+    ) -> None:
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        # Scores a coalesced batch, e.g. PredictionExecutor.submit, so batches run on the
+        # executor's pool while this thread collects the next one. None scores inline.
+        self._submit = submit
+        self._queue: queue.Queue[_Pending | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._max_batch_seen = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._max_depth_seen = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def submit(self, model: LoadedModel, row: np.ndarray) -> Future:
+        self.start()
+        pending = _Pending(model=model, row=row)
+        self._queue.put(pending)
+        depth = self._queue.qsize()
+        if depth > self._max_depth_seen:
+            self._max_depth_seen = depth
+        return pending.future
+
+    def metrics(self) -> dict:
+        batches = self._batches
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self._max_depth_seen,
+            "batches": batches,
+            "rows": self._rows,
+            "mean_batch_size": self._rows / batches if batches else 0.0,
+            "max_batch_size": self._max_batch_seen,
+            "mean_wait_ms": self._wait_total / self._rows * 1000 if self._rows else 0.0,
+            "max_wait_ms": self._wait_max * 1000,
+        }
+
+    def _collect(self, first: _Pending) -> tuple[list[_Pending], bool]:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stopping = self._collect(first)
+            self._score(batch)
+            if stopping:
+                return
+
+    def _score(self, batch: list[_Pending]) -> None:
+        started = time.perf_counter()
+        for pending in batch:
+            waited = started - pending.enqueued
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        self._batches += 1
+        self._rows += len(batch)
+        self._max_batch_seen = max(self._max_batch_seen, len(batch))
+
+        groups: dict[int, list[_Pending]] = {}
+        for pending in batch:
+            groups.setdefault(id(pending.model), []).append(pending)
+        for items in groups.values():
+            scored = self._predict(items[0].model, np.vstack([p.row for p in items]))
+            scored.add_done_callback(lambda done, items=items: self._resolve(items, done))
+
+    def _predict(self, model: LoadedModel, X: np.ndarray) -> Future:
+        if self._submit is not None:
+            try:
+                return self._submit(model, X)
+            except Exception as exc:
+                scored: Future = Future()
+                scored.set_exception(exc)
+                return scored
+        scored = Future()
+        try:
+            scored.set_result(model.predictor.predict_many(X))
+        except Exception as exc:
+            scored.set_exception(exc)
+        return scored
+
+    def _resolve(self, items: list[_Pending], scored: Future) -> None:
+        exc = scored.exception()
+        if exc is not None:
+            log.warning("Batched prediction failed (rows={}): {}", len(items), exc)
+            for pending in items:
+                pending.future.set_exception(exc)
+            return
+        for pending, value in zip(items, scored.result(), strict=True):
+            pending.future.set_result(float(value))
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from api.inference import LoadedModel
+
+
+def parse_quantize(value: str) -> dict[str, float]:
+    steps: dict[str, float] = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, sep, step = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Invalid quantize spec: {item!r} (expected name=step)")
+        steps[name.strip()] = float(step)
+    return steps
+
+
+class PredictionCache:
+    def __init__(
+        self,
+        max_entries: int = 0,
+        ttl_seconds: float = 300.0,
+        quantize: Mapping[str, float] | None = None,
+    ) -> None:
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.quantize_steps = dict(quantize or {})
+        self._entries: OrderedDict[tuple[str, bytes], tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._flushes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def quantize(self, features: Sequence[str], row: np.ndarray) -> np.ndarray:
+        for idx, name in enumerate(features):
+            step = self.quantize_steps.get(name)
+            if step:
+                row[idx] = round(row[idx] / step) * step
+        return row
+
+    def key(self, model: LoadedModel, row: np.ndarray) -> tuple[str, bytes]:
+        # Adding 0.0 folds -0.0 into 0.0 so equal vectors hash to the same bytes.
+        return f"{model.path}:{model.signature}", (row + 0.0).tobytes()
+
+    def get(self, key: tuple[str, bytes]) -> float | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: tuple[str, bytes], value: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self, *_args) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._flushes += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "flushes": self._flushes,
+            }
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Mapping
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from api.inference import LoadedModel, compile_bundle
+
+EXECUTOR_KINDS = ("thread", "process")
+
+# Per-process model cache used by process-pool workers, keyed by model path.
+_WORKER_MODELS: dict[str, LoadedModel] = {}
+
+
+class ExecutorSaturatedError(RuntimeError):
+    pass
+
+
+def predict_in_worker(
+    model_path: str, signature: str, X: np.ndarray, mmap_mode: str | None = None
+) -> np.ndarray:
+    loaded = _WORKER_MODELS.get(model_path)
+    if loaded is None or loaded.signature != signature:
+        bundle = joblib.load(model_path, mmap_mode=mmap_mode)
+        loaded = compile_bundle(bundle, path=Path(model_path), signature=signature)
+        _WORKER_MODELS[model_path] = loaded
+    return loaded.predictor.predict_many(X)
+
+
+class PredictionExecutor:
+    def __init__(
+        self,
+        kind: str = "thread",
+        workers: int = 4,
+        max_pending: int = 256,
+        mmap_mode: str | None = None,
+    ) -> None:
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unsupported executor kind: {kind}")
+        self.kind = kind
+        self.mmap_mode = mmap_mode
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._pool: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _ensure_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="predict"
+                    )
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool = self._pool
+            self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise ExecutorSaturatedError(
+                    f"Prediction queue full ({self._pending}/{self.max_pending} pending)."
+                )
+            self._pending += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def submit(self, model: LoadedModel, X: np.ndarray) -> Future:
+        # No back-pressure accounting here; callers acquire/release around the request.
+        pool = self._ensure_pool()
+        if self.kind == "process":
+            return pool.submit(
+                predict_in_worker, str(model.path), model.signature, X, self.mmap_mode
+            )
+        return pool.submit(model.predictor.predict_many, X)
+
+    async def predict(self, model: LoadedModel, X: np.ndarray) -> np.ndarray:
+        self.acquire()
+        try:
+            return await asyncio.wrap_future(self.submit(model, X))
+        finally:
+            self.release()
+
+    async def predict_one(self, model: LoadedModel, values: Mapping[str, float]) -> float:
+        if self.kind == "process":
+            row = model.predictor.row_vector(values)
+            return float((await self.predict(model, row[np.newaxis, :]))[0])
+        self.acquire()
+        try:
+            pool = self._ensure_pool()
+            return await asyncio.wrap_future(pool.submit(model.predictor.predict_one, values))
+        finally:
+            self.release()
+
+    def metrics(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+import warnings
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Feature names are checked once in CompiledPredictor; the per-call sklearn warning
+# for ndarray input is redundant afterwards, so predict calls silence it locally.
+_NO_FEATURE_NAMES_WARNING = "X does not have valid feature names"
+
+
+class CompiledPredictor:
+    def __init__(self, model, features: Sequence[str]) -> None:
+        self.model = model
+        self.features = list(features)
+        self._local = threading.local()
+        self._quiet = False
+
+        fitted_names = getattr(model, "feature_names_in_", None)
+        if fitted_names is not None:
+            fitted_names = [str(name) for name in fitted_names]
+            if fitted_names != self.features:
+                raise ValueError(
+                    "Model bundle features do not match estimator feature names: "
+                    f"{self.features} != {fitted_names}"
+                )
+            self._quiet = True
+        n_features_in = getattr(model, "n_features_in_", None)
+        if n_features_in is not None and n_features_in != len(self.features):
+            raise ValueError(
+                f"Model expects {n_features_in} features, bundle lists {len(self.features)}."
+            )
+
+    def _row_buffer(self) -> np.ndarray:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = np.empty((1, len(self.features)), dtype=np.float64)
+            self._local.buffer = buffer
+        return buffer
+
+    def predict_one(self, values: Mapping[str, float]) -> float:
+        buffer = self._row_buffer()
+        row = buffer[0]
+        for idx, name in enumerate(self.features):
+            row[idx] = values[name]
+        return float(self._predict(buffer)[0])
+
+    def row_vector(self, values: Mapping[str, float]) -> np.ndarray:
+        return np.fromiter(
+            (values[name] for name in self.features), dtype=np.float64, count=len(self.features)
+        )
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        if not self._quiet:
+            return self.model.predict(X)
+        with warnings.catch_warnings():
+            warnings.filterwarnings(
+                "ignore", message=_NO_FEATURE_NAMES_WARNING, category=UserWarning
+            )
+            return self.model.predict(X)
+
+    def predict_many(self, X: np.ndarray) -> np.ndarray:
+        return self._predict(np.ascontiguousarray(X, dtype=np.float64))
+
+    def warmup(self) -> None:
+        self.predict_one(dict.fromkeys(self.features, 0.0))
+        self.predict_many(np.zeros((2, len(self.features)), dtype=np.float64))
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    bundle: dict
+    predictor: CompiledPredictor
+    path: Path | None = None
+    signature: str = ""
+
+    @property
+    def features(self) -> list[str]:
+        return self.predictor.features
+
+
+def compile_bundle(
+    model_bundle: dict, path: Path | None = None, signature: str = ""
+) -> LoadedModel:
+    features = model_bundle.get("features", [])
+    if not features:
+        raise ValueError("Model bundle missing feature list.")
+    return LoadedModel(
+        bundle=model_bundle,
+        predictor=CompiledPredictor(model_bundle["model"], features),
+        path=path,
+        signature=signature,
+    )
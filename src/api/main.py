@@ -1,19 +1,106 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import math
 import os
-from functools import lru_cache
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any
 
-import joblib
+import numpy as np
 import pandas as pd
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
+from api.batching import MicroBatcher
+from api.cache import PredictionCache, parse_quantize
+from api.executor import ExecutorSaturatedError, PredictionExecutor
+from api.inference import LoadedModel
+from api.model_store import ModelStore
+from api.registry import ModelRegistry
 from config.logging import configure_logging, log
 
 configure_logging()
 
-app = FastAPI(title="MyMLZoomcamp2025 API")
+
+def _env_flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "y", "on"}
+
+
+def _model_path() -> Path:
+    return Path(os.getenv("MODEL_PATH", "models/model.joblib"))
+
+
+def _reload_interval() -> float:
+    return float(os.getenv("MODEL_RELOAD_INTERVAL", "5"))
+
+
+def _max_batch_rows() -> int:
+    return int(os.getenv("MAX_BATCH_ROWS", "10000"))
+
+
+def _mmap_mode() -> str | None:
+    return "r" if _env_flag("MODEL_MMAP") else None
+
+
+def _batching_enabled() -> bool:
+    return _env_flag("PREDICT_BATCHING")
+
+
+model_store = ModelStore(use_hash=_env_flag("MODEL_RELOAD_HASH"), mmap_mode=_mmap_mode())
+model_registry = ModelRegistry(
+    models_dir=Path(os.getenv("MODELS_DIR", "models")),
+    max_bytes=int(float(os.getenv("MODEL_REGISTRY_MAX_MB", "1024")) * 1024 * 1024),
+    mmap_mode=_mmap_mode(),
+)
+prediction_cache = PredictionCache(
+    max_entries=int(os.getenv("PREDICT_CACHE_SIZE", "0")),
+    ttl_seconds=float(os.getenv("PREDICT_CACHE_TTL", "300")),
+    quantize=parse_quantize(os.getenv("PREDICT_CACHE_QUANTIZE", "")),
+)
+model_store.add_listener(prediction_cache.clear)
+predict_executor = PredictionExecutor(
+    kind=os.getenv("PREDICT_EXECUTOR", "thread"),
+    workers=int(os.getenv("PREDICT_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_pending=int(os.getenv("PREDICT_MAX_PENDING", "256")),
+    mmap_mode=_mmap_mode(),
+)
+micro_batcher = MicroBatcher(
+    max_batch_size=int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64")),
+    max_wait_ms=float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "2")),
+    submit=predict_executor.submit,
+)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    model_path = _model_path()
+    try:
+        await asyncio.to_thread(model_store.load, model_path)
+    except FileNotFoundError as exc:
+        log.warning("Model not preloaded: {}", exc)
+
+    if _batching_enabled():
+        micro_batcher.start()
+
+    watcher = None
+    interval = _reload_interval()
+    if interval > 0:
+        watcher = asyncio.create_task(model_store.watch(model_path, interval))
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(micro_batcher.stop)
+        await asyncio.to_thread(predict_executor.shutdown)
+        if watcher is not None:
+            watcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await watcher
+
+
+app = FastAPI(title="MyMLZoomcamp2025 API", lifespan=lifespan)
 
 
 class PredictRequest(BaseModel):
@@ -24,11 +111,126 @@ class PredictResponse(BaseModel):
     prediction: float
 
 
-@lru_cache(maxsize=1)
-def _load_model_bundle(model_path: Path) -> dict:
-    if not model_path.exists():
-        raise FileNotFoundError(f"Model not found: {model_path}")
-    return joblib.load(model_path)
+class BatchPredictRequest(BaseModel):
+    rows: list[dict[str, Any]] | None = None
+    columns: dict[str, list[Any]] | None = None
+
+
+class RowError(BaseModel):
+    index: int
+    detail: str
+
+
+class BatchPredictResponse(BaseModel):
+    predictions: list[float | None]
+    errors: list[RowError]
+
+
+def _get_model(model_path: Path) -> LoadedModel:
+    try:
+        return model_store.get(model_path)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+async def _get_model_async() -> LoadedModel:
+    model_path = _model_path()
+    current = model_store.current
+    if current is not None and current.path == model_path:
+        return current
+    return await asyncio.to_thread(_get_model, model_path)
+
+
+async def _get_registry_model(name: str) -> LoadedModel:
+    try:
+        model_registry.resolve(name)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    try:
+        return await asyncio.to_thread(model_registry.get, name)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+def _saturated(exc: ExecutorSaturatedError) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(exc))
+
+
+def _to_float(value: Any) -> float | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _row_matrix(
+    rows: list[Mapping[str, Any]], features: list[str]
+) -> tuple[np.ndarray, np.ndarray, list[RowError]]:
+    X = np.zeros((len(rows), len(features)), dtype=np.float64)
+    valid = np.ones(len(rows), dtype=bool)
+    errors: list[RowError] = []
+    for idx, row in enumerate(rows):
+        missing = [name for name in features if name not in row]
+        if missing:
+            valid[idx] = False
+            errors.append(
+                RowError(index=idx, detail=f"Missing required features: {', '.join(missing)}")
+            )
+            continue
+        invalid = []
+        for col, name in enumerate(features):
+            number = _to_float(row[name])
+            if number is None:
+                invalid.append(name)
+            else:
+                X[idx, col] = number
+        if invalid:
+            valid[idx] = False
+            errors.append(
+                RowError(index=idx, detail=f"Invalid values for features: {', '.join(invalid)}")
+            )
+    return X, valid, errors
+
+
+def _column_matrix(
+    columns: Mapping[str, list[Any]], features: list[str]
+) -> tuple[np.ndarray, np.ndarray, list[RowError]]:
+    missing = [name for name in features if name not in columns]
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required features: {', '.join(missing)}",
+        )
+    lengths = {len(columns[name]) for name in features}
+    if len(lengths) > 1:
+        raise HTTPException(status_code=400, detail="Feature columns must have equal length.")
+    n_rows = lengths.pop()
+
+    X = np.zeros((n_rows, len(features)), dtype=np.float64)
+    bad = np.zeros((n_rows, len(features)), dtype=bool)
+    for col, name in enumerate(features):
+        values = pd.to_numeric(pd.Series(columns[name], dtype=object), errors="coerce")
+        values = values.to_numpy(dtype=np.float64)
+        bad[:, col] = ~np.isfinite(values)
+        X[:, col] = np.where(bad[:, col], 0.0, values)
+
+    valid = ~bad.any(axis=1)
+    errors = [
+        RowError(
+            index=int(idx),
+            detail="Invalid values for features: "
+            + ", ".join(name for col, name in enumerate(features) if bad[idx, col]),
+        )
+        for idx in np.flatnonzero(~valid)
+    ]
+    return X, valid, errors
 
 
 @app.get("/health")
@@ -37,17 +239,18 @@ def health() -> dict:
     return {"status": "ok"}
 
 
-@app.post("/predict", response_model=PredictResponse)
-def predict(payload: PredictRequest) -> PredictResponse:
-    model_path = Path(os.getenv("MODEL_PATH", "models/model.joblib"))
-    try:
-        model_bundle = _load_model_bundle(model_path)
-    except FileNotFoundError as exc:
-        raise HTTPException(status_code=503, detail=str(exc)) from exc
+@app.get("/metrics")
+def metrics() -> dict:
+    return {
+        "batching": micro_batcher.metrics(),
+        "executor": predict_executor.metrics(),
+        "registry": model_registry.metrics(),
+        "cache": prediction_cache.metrics(),
+    }
 
-    features = model_bundle.get("features", [])
-    if not features:
-        raise HTTPException(status_code=500, detail="Model bundle missing feature list.")
+
+async def _score_one(model: LoadedModel, payload: PredictRequest) -> PredictResponse:
+    features = model.features
 
     missing = [name for name in features if name not in payload.features]
     if missing:
@@ -56,8 +259,107 @@ def predict(payload: PredictRequest) -> PredictResponse:
             detail=f"Missing required features: {', '.join(missing)}",
         )
 
-    row = {name: payload.features[name] for name in features}
-    X = pd.DataFrame([row])
-    prediction = float(model_bundle["model"].predict(X)[0])
+    row = None
+    cache_key = None
+    if prediction_cache.enabled:
+        row = prediction_cache.quantize(features, model.predictor.row_vector(payload.features))
+        cache_key = prediction_cache.key(model, row)
+        cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            return PredictResponse(prediction=cached)
+
+    try:
+        if _batching_enabled():
+            if row is None:
+                row = model.predictor.row_vector(payload.features)
+            predict_executor.acquire()
+            try:
+                prediction = await asyncio.wrap_future(micro_batcher.submit(model, row))
+            finally:
+                predict_executor.release()
+        elif row is not None:
+            prediction = float((await predict_executor.predict(model, row[np.newaxis, :]))[0])
+        else:
+            prediction = await predict_executor.predict_one(model, payload.features)
+    except ExecutorSaturatedError as exc:
+        raise _saturated(exc) from exc
+    if cache_key is not None:
+        prediction_cache.put(cache_key, prediction)
     log.info("Prediction requested (features={})", len(features))
     return PredictResponse(prediction=prediction)
+
+
+def _check_batch_layout(payload: BatchPredictRequest) -> None:
+    if (payload.rows is None) == (payload.columns is None):
+        raise HTTPException(
+            status_code=422,
+            detail="Provide exactly one of 'rows' or 'columns'.",
+        )
+
+
+async def _score_batch(model: LoadedModel, payload: BatchPredictRequest) -> BatchPredictResponse:
+    features = model.features
+
+    if payload.rows is not None:
+        n_rows = len(payload.rows)
+    else:
+        # Only feature columns are scored; extra columns in the payload are ignored.
+        n_rows = max((len(payload.columns.get(name, [])) for name in features), default=0)
+    if n_rows > _max_batch_rows():
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {n_rows} rows (max {_max_batch_rows()}).",
+        )
+
+    if payload.rows is not None:
+        X, valid, errors = await asyncio.to_thread(_row_matrix, payload.rows, features)
+    else:
+        X, valid, errors = await asyncio.to_thread(_column_matrix, payload.columns, features)
+
+    predictions: list[float | None] = [None] * len(valid)
+    if valid.any():
+        try:
+            scored = await predict_executor.predict(model, X[valid])
+        except ExecutorSaturatedError as exc:
+            raise _saturated(exc) from exc
+        for idx, value in zip(np.flatnonzero(valid), scored, strict=True):
+            predictions[idx] = float(value)
+
+    log.info(
+        "Batch prediction requested (rows={}, errors={}, features={})",
+        len(valid),
+        len(errors),
+        len(features),
+    )
+    return BatchPredictResponse(predictions=predictions, errors=errors)
+
+
+@app.post("/predict", response_model=PredictResponse)
+async def predict(payload: PredictRequest) -> PredictResponse:
+    model = await _get_model_async()
+    return await _score_one(model, payload)
+
+
+@app.post("/predict/batch", response_model=BatchPredictResponse)
+async def predict_batch(payload: BatchPredictRequest) -> BatchPredictResponse:
+    _check_batch_layout(payload)
+    model = await _get_model_async()
+    return await _score_batch(model, payload)
+
+
+@app.get("/models")
+def list_models() -> dict:
+    return {"available": model_registry.available(), "loaded": model_registry.loaded()}
+
+
+@app.post("/models/{name}/predict", response_model=PredictResponse)
+async def predict_named(name: str, payload: PredictRequest) -> PredictResponse:
+    model = await _get_registry_model(name)
+    return await _score_one(model, payload)
+
+
+@app.post("/models/{name}/predict/batch", response_model=BatchPredictResponse)
+async def predict_named_batch(name: str, payload: BatchPredictRequest) -> BatchPredictResponse:
+    _check_batch_layout(payload)
+    model = await _get_registry_model(name)
+    return await _score_batch(model, payload)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import joblib
+
+from api.inference import LoadedModel, compile_bundle
+from config.logging import log
+
+
+def file_stat(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_model(
+    model_path: Path, use_hash: bool = False, mmap_mode: str | None = None
+) -> LoadedModel:
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model not found: {model_path}")
+    signature = file_hash(model_path) if use_hash else file_stat(model_path)
+    model_bundle = joblib.load(model_path, mmap_mode=mmap_mode)
+    if mmap_mode and not model_bundle.get("mmap_compatible", True):
+        log.warning("Model {} is compressed; loaded into memory instead of mmap", model_path)
+    loaded = compile_bundle(model_bundle, path=model_path, signature=signature)
+    loaded.predictor.warmup()
+    return loaded
+
+
+class ModelStore:
+    def __init__(self, use_hash: bool = False, mmap_mode: str | None = None) -> None:
+        self.use_hash = use_hash
+        self.mmap_mode = mmap_mode
+        self._lock = threading.Lock()
+        self._current: LoadedModel | None = None
+        self._stat: str | None = None
+        self._listeners: list[Callable[[LoadedModel], None]] = []
+
+    @property
+    def current(self) -> LoadedModel | None:
+        return self._current
+
+    def add_listener(self, listener: Callable[[LoadedModel], None]) -> None:
+        self._listeners.append(listener)
+
+    def get(self, model_path: Path) -> LoadedModel:
+        current = self._current
+        if current is not None and current.path == model_path:
+            return current
+        with self._lock:
+            current = self._current
+            if current is not None and current.path == model_path:
+                return current
+            return self._load_locked(model_path)
+
+    def load(self, model_path: Path) -> LoadedModel:
+        with self._lock:
+            return self._load_locked(model_path)
+
+    def reload_if_changed(self, model_path: Path) -> bool:
+        if not model_path.exists():
+            return False
+        current = self._current
+        stat = file_stat(model_path)
+        if current is not None and current.path == model_path and stat == self._stat:
+            return False
+        with self._lock:
+            current = self._current
+            if current is not None and current.path == model_path:
+                if stat == self._stat:
+                    return False
+                if self.use_hash and file_hash(model_path) == current.signature:
+                    self._stat = stat
+                    return False
+            try:
+                self._load_locked(model_path)
+            except Exception as exc:
+                log.warning("Model reload failed, keeping previous model: {}", exc)
+                return False
+        return True
+
+    async def watch(self, model_path: Path, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed, model_path)
+            except OSError as exc:
+                log.warning("Model watch failed for {}: {}", model_path, exc)
+
+    def _load_locked(self, model_path: Path) -> LoadedModel:
+        stat = file_stat(model_path)
+        loaded = load_model(model_path, self.use_hash, self.mmap_mode)
+
+        previous = self._current
+        self._current = loaded
+        self._stat = stat
+        log.info("Loaded model {} (signature={})", model_path, loaded.signature)
+        if previous is not None:
+            for listener in self._listeners:
+                listener(loaded)
+        return loaded
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from api.inference import LoadedModel
+from api.model_store import file_stat, load_model
+from config.logging import log
+
+_MODEL_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+def _bundle_nbytes(bundle) -> int:
+    """Estimated in-memory size of a loaded bundle: the bytes of every NumPy array in it.
+
+    Fitted estimators keep their parameters in arrays (coefficients, tree nodes), so the
+    arrays dominate; compressed or pickled sizes on disk can be far smaller or larger.
+    Extension types without ``__dict__`` (e.g. sklearn's ``Tree``) expose their arrays
+    through ``__getstate__``.
+    """
+    # ``seen`` keeps a reference to every visited object: ``__getstate__`` returns fresh
+    # arrays, whose ids could otherwise be reused by later temporaries.
+    total, seen, stack = 0, {}, [bundle]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen[id(obj)] = obj
+        if isinstance(obj, np.ndarray):
+            total += obj.nbytes
+            if obj.dtype == object:
+                stack.extend(obj.ravel())
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, list | tuple | set | frozenset):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+        elif not isinstance(obj, str | bytes | int | float | bool | type(None)):
+            state = getattr(obj, "__getstate__", None)
+            if state is not None:
+                try:
+                    state = state()
+                except TypeError:
+                    continue
+                if isinstance(state, dict):
+                    stack.extend(state.values())
+    return total
+
+
+@dataclass(frozen=True)
+class _Entry:
+    model: LoadedModel
+    stat: str
+    nbytes: int
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        models_dir: Path,
+        max_bytes: int,
+        suffix: str = ".joblib",
+        mmap_mode: str | None = None,
+    ) -> None:
+        self.models_dir = models_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.mmap_mode = mmap_mode
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        self._resident_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def resolve(self, name: str) -> Path:
+        if not _MODEL_NAME.match(name) or ".." in name:
+            raise ValueError(f"Invalid model name: {name}")
+        return self.models_dir / f"{name}{self.suffix}"
+
+    def available(self) -> list[str]:
+        if not self.models_dir.exists():
+            return []
+        return sorted(
+            path.name.removesuffix(self.suffix) for path in self.models_dir.glob(f"*{self.suffix}")
+        )
+
+    def loaded(self) -> list[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, name: str) -> LoadedModel:
+        path = self.resolve(name)
+        if not path.exists():
+            raise FileNotFoundError(f"Model not found: {name}")
+        stat = file_stat(path)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry.stat == stat:
+                self._entries.move_to_end(name)
+                self._hits += 1
+                return entry.model
+            self._misses += 1
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None and entry.stat == stat:
+                    self._entries.move_to_end(name)
+                    return entry.model
+            model = load_model(path, mmap_mode=self.mmap_mode)
+            self._insert(name, _Entry(model=model, stat=stat, nbytes=_bundle_nbytes(model.bundle)))
+        return model
+
+    def _insert(self, name: str, entry: _Entry) -> None:
+        with self._lock:
+            previous = self._entries.pop(name, None)
+            if previous is not None:
+                self._resident_bytes -= previous.nbytes
+            self._entries[name] = entry
+            self._resident_bytes += entry.nbytes
+            while self._resident_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted, old = self._entries.popitem(last=False)
+                self._resident_bytes -= old.nbytes
+                self._evictions += 1
+                log.info("Evicted model {} ({} bytes) from registry", evicted, old.nbytes)
+            if self._resident_bytes > self.max_bytes:
+                log.warning(
+                    "Model {} ({} bytes) exceeds registry budget of {} bytes",
+                    name,
+                    entry.nbytes,
+                    self.max_bytes,
+                )
+        log.info("Loaded model {} into registry ({} bytes)", name, entry.nbytes)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": len(self._entries),
+                "resident_bytes": self._resident_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -29,6 +30,12 @@ def _env_bool(name: str) -> bool:
     return value.lower() in {"1", "true", "yes", "y"}
 
 
+def _predictions_cache() -> Path | None:
+    # Opt-in: the cache is unbounded, one parquet file per (model, data file) pair.
+    value = os.getenv("PREDICTIONS_CACHE_DIR", "")
+    return Path(value) if value else None
+
+
 def _parse_months(value: str) -> list[int]:
     return [int(item.strip()) for item in value.split(",") if item.strip()]
 
@@ -126,7 +133,11 @@ def trained_model(prepared_data: dict) -> TrainingArtifacts:
 def evaluation_report(prepared_data: dict, trained_model: TrainingArtifacts) -> dict:
     data_path = Path(prepared_data["processed_path"])
     output_path = Path(trained_model.evaluation_path)
-    metrics = evaluate_model(data_path, Path(trained_model.model_path))
+    metrics = evaluate_model(
+        data_path,
+        Path(trained_model.model_path),
+        predictions_cache=_predictions_cache(),
+    )
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_text(json.dumps(metrics, indent=2))
     metrics["status"] = "evaluated"
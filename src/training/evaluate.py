@@ -2,17 +2,34 @@ from __future__ import annotations
 
 import argparse
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 from config.logging import configure_logging, log
-from config.paths import REPORTS_DIR
+from config.paths import REPORTS_DIR, RUN_DIR
+from training.predictions import PredictionReader, PredictionWriter, model_key, predictions_path
+from training.streaming import (
+    StreamingMetrics,
+    iter_batches,
+    matches_partition,
+    parse_partition_filter,
+    read_columns,
+    read_table,
+    row_filter,
+)
 
 configure_logging()
 
+SLICE_COLUMNS = ("pickup_hour", "pickup_weekday", "PULocationID", "is_airport_pickup")
+DISTANCE_EDGES = np.array([0.0, 1.0, 2.0, 5.0, 10.0, 20.0])
+DISTANCE_LABELS = np.array(["<0", "0-1", "1-2", "2-5", "5-10", "10-20", "20+"])
+_SUM_COLUMNS = ["samples", "abs_error", "sq_error", "y_sum", "y_sq_sum"]
+
 
 def _infer_format(path: Path) -> str:
     suffix = path.suffix.lower()
@@ -23,12 +40,12 @@ def _infer_format(path: Path) -> str:
     raise ValueError(f"Unsupported data format: {suffix}")
 
 
-def _load_data(path: Path) -> pd.DataFrame:
+def _load_data(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
     fmt = _infer_format(path)
     if fmt == "parquet":
-        return pd.read_parquet(path)
+        return pd.read_parquet(path, columns=columns)
     if fmt == "csv":
-        return pd.read_csv(path)
+        return pd.read_csv(path, usecols=columns)
     raise ValueError(f"Unsupported data format: {fmt}")
 
 
@@ -42,34 +59,275 @@ def _compute_metrics(y_true, y_pred) -> dict:
     }
 
 
-def evaluate_model(data_path: Path, model_path: Path) -> dict:
+def _data_files(path: Path, partition_filter: dict[str, list[str]] | None = None) -> list[Path]:
+    # Hive partition directories (year=2024/month=1/...) are pruned here, before any file
+    # is opened; filters on data columns are left to the per-file readers.
+    if path.is_dir():
+        return sorted(
+            child
+            for child in path.rglob("*")
+            if child.suffix.lower() in {".parquet", ".csv"}
+            and matches_partition(child.relative_to(path), partition_filter)
+        )
+    return [path]
+
+
+def _file_rows(
+    path: Path, data_path: Path, partition_filter: dict[str, list[str]] | None
+) -> dict[str, list[str]] | None:
+    relative = path.relative_to(data_path) if data_path.is_dir() else Path(path.name)
+    return row_filter(relative, partition_filter)
+
+
+def _frames(
+    path: Path,
+    batch_size: int | None,
+    columns: list[str],
+    rows: dict[str, list[str]] | None = None,
+):
+    if batch_size:
+        yield from iter_batches(path, batch_size, columns, rows)
+    elif rows:
+        yield read_table(path, columns, rows)
+    else:
+        yield _load_data(path, columns)
+
+
+def _scored_frames(
+    path: Path,
+    model_bundle: dict,
+    model_hash: str | None,
+    columns: list[str],
+    batch_size: int | None,
+    predictions_cache: Path | None,
+    stats: dict,
+    rows: dict[str, list[str]] | None = None,
+):
+    # Yields (frame, predictions) for one data file. With a cache dir, predictions are
+    # persisted per (model, data) content hash and later runs skip the model entirely;
+    # ``model_hash`` is the model's key from ``model_key``, hashed once by the caller.
+    features = model_bundle["features"]
+    model = model_bundle["model"]
+    with_features = list(dict.fromkeys([*columns, *features]))
+
+    def predict(frame: pd.DataFrame) -> np.ndarray:
+        # A row filter can leave a file empty; estimators reject zero-row input.
+        return model.predict(frame[features]) if len(frame) else np.empty(0, dtype=np.float64)
+
+    if predictions_cache is None:
+        for frame in _frames(path, batch_size, with_features, rows):
+            yield frame, predict(frame)
+        return
+
+    variant = json.dumps(rows, sort_keys=True) if rows else ""
+    cache_path = predictions_path(predictions_cache, model_hash, path, variant)
+    if cache_path.exists():
+        stats["hits"] += 1
+        reader = PredictionReader(cache_path)
+        for frame in _frames(path, batch_size, columns, rows):
+            yield frame, reader.take(len(frame))
+        reader.finish()
+        return
+
+    stats["misses"] += 1
+    writer = PredictionWriter(cache_path)
+    try:
+        for frame in _frames(path, batch_size, with_features, rows):
+            preds = predict(frame)
+            writer.write(preds)
+            yield frame, preds
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+
+def evaluate_model(
+    data_path: Path,
+    model_path: Path,
+    batch_size: int | None = None,
+    predictions_cache: Path | None = None,
+    partition_filter: dict[str, list[str]] | None = None,
+) -> dict:
     if not data_path.exists():
         raise FileNotFoundError(f"Data file not found: {data_path}")
     if not model_path.exists():
         raise FileNotFoundError(f"Model file not found: {model_path}")
 
-    df = _load_data(data_path)
     model_bundle = joblib.load(model_path)
     target = model_bundle.get("target", "trip_duration")
     features = model_bundle.get("features")
-    if target not in df.columns:
-        raise ValueError(f"Missing target column: {target}")
     if not features:
         raise ValueError("Model bundle missing feature list.")
 
-    X = df[features]
-    y = df[target]
-    preds = model_bundle["model"].predict(X)
-    metrics = _compute_metrics(y, preds)
+    files = _data_files(data_path, partition_filter)
+    if not files:
+        raise FileNotFoundError(f"No data files found under: {data_path}")
+    for path in files:
+        if target not in read_columns(path):
+            raise ValueError(f"Missing target column: {target}")
 
-    log.info("Evaluation complete (rows={})", len(df))
-    return {
+    stats = {"hits": 0, "misses": 0}
+    model_hash = model_key(model_path) if predictions_cache is not None else None
+    scored = (
+        pair
+        for path in files
+        for pair in _scored_frames(
+            path,
+            model_bundle,
+            model_hash,
+            [target],
+            batch_size,
+            predictions_cache,
+            stats,
+            _file_rows(path, data_path, partition_filter),
+        )
+    )
+    if batch_size:
+        # Only the current batch is resident; metrics are running sums over all batches.
+        running = StreamingMetrics()
+        batches = 0
+        for frame, preds in scored:
+            running.update(frame[target].to_numpy(), preds)
+            batches += 1
+        if not running.count:
+            raise ValueError(f"No rows to evaluate under: {data_path}")
+        metrics = running.result()
+        metrics["batches"] = batches
+    else:
+        pairs = [(frame[target].to_numpy(), preds) for frame, preds in scored]
+        if not sum(len(targets) for targets, _ in pairs):
+            raise ValueError(f"No rows to evaluate under: {data_path}")
+        targets, preds = zip(*pairs)
+        metrics = _compute_metrics(np.concatenate(targets), np.concatenate(preds))
+
+    log.info("Evaluation complete (rows={})", metrics["samples"])
+    result = {
         "model_type": model_bundle.get("model_type", "unknown"),
         "params": model_bundle.get("params", {}),
         "metrics": metrics,
         "target": target,
         "features": features,
     }
+    if predictions_cache is not None:
+        result["predictions_cache"] = {"dir": str(predictions_cache), **stats}
+    return result
+
+
+def _slice_values(values: pd.Series) -> np.ndarray:
+    # Integer codes may arrive as int in one file and float in another (e.g. a column that
+    # had NULLs); both must format the same, so 1 and 1.0 land in one slice.
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.notna().sum() != values.notna().sum():
+        return values.astype(str).to_numpy()
+    if numeric.dropna().mod(1).eq(0).all():
+        numeric = numeric.astype("Int64")
+    return numeric.astype(str).to_numpy()
+
+
+def _slice_sums(df: pd.DataFrame, preds: np.ndarray, target: str) -> pd.DataFrame:
+    # One group-by over a long (slice, value) frame: every row appears once per slice
+    # dimension, so all slice metrics come out of a single aggregation.
+    keys = {name: _slice_values(df[name]) for name in SLICE_COLUMNS if name in df.columns}
+    if "trip_distance" in df.columns:
+        buckets = np.searchsorted(DISTANCE_EDGES, df["trip_distance"].to_numpy(), side="right")
+        keys["distance_bucket"] = DISTANCE_LABELS[buckets]
+    if not keys:
+        raise ValueError("Data has none of the slice columns.")
+
+    y = df[target].to_numpy(dtype=np.float64)
+    errors = y - np.asarray(preds, dtype=np.float64)
+    repeats = len(keys)
+    long = pd.DataFrame(
+        {
+            "slice": np.repeat(list(keys), len(df)),
+            "value": np.concatenate([values.astype(str) for values in keys.values()]),
+            "samples": 1,
+            "abs_error": np.tile(np.abs(errors), repeats),
+            "sq_error": np.tile(np.square(errors), repeats),
+            "y_sum": np.tile(y, repeats),
+            "y_sq_sum": np.tile(np.square(y), repeats),
+        }
+    )
+    return long.groupby(["slice", "value"], sort=False)[_SUM_COLUMNS].sum()
+
+
+def _file_slice_sums(
+    path: Path,
+    model_path: Path,
+    model_hash: str | None,
+    batch_size: int | None,
+    predictions_cache: Path | None,
+    rows: dict[str, list[str]] | None = None,
+) -> pd.DataFrame:
+    model_bundle = joblib.load(model_path)
+    target = model_bundle.get("target", "trip_duration")
+    available = read_columns(path)
+    slice_sources = [name for name in (*SLICE_COLUMNS, "trip_distance") if name in available]
+    scored = _scored_frames(
+        path,
+        model_bundle,
+        model_hash,
+        list(dict.fromkeys([target, *slice_sources])),
+        batch_size,
+        predictions_cache,
+        {"hits": 0, "misses": 0},
+        rows,
+    )
+    parts = [_slice_sums(frame, preds, target) for frame, preds in scored if len(frame)]
+    if not parts:
+        # A row filter can leave nothing of this file; it then adds no slices.
+        index = pd.MultiIndex.from_arrays([[], []], names=["slice", "value"])
+        return pd.DataFrame({name: np.zeros(0) for name in _SUM_COLUMNS}, index=index)
+    return pd.concat(parts).groupby(level=[0, 1], sort=False).sum()
+
+
+def slice_metrics(
+    data_path: Path,
+    model_path: Path,
+    workers: int = 1,
+    batch_size: int | None = None,
+    predictions_cache: Path | None = None,
+    partition_filter: dict[str, list[str]] | None = None,
+) -> pd.DataFrame:
+    files = _data_files(data_path, partition_filter)
+    if not files:
+        raise FileNotFoundError(f"No data files found under: {data_path}")
+    model_hash = model_key(model_path) if predictions_cache is not None else None
+    jobs = [
+        (
+            path,
+            model_path,
+            model_hash,
+            batch_size,
+            predictions_cache,
+            _file_rows(path, data_path, partition_filter),
+        )
+        for path in files
+    ]
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+            futures = [pool.submit(_file_slice_sums, *job) for job in jobs]
+            parts = [future.result() for future in futures]
+    else:
+        parts = [_file_slice_sums(*job) for job in jobs]
+
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        raise ValueError(f"No rows to evaluate under: {data_path}")
+    sums = pd.concat(parts).groupby(level=[0, 1]).sum()
+    count = sums["samples"]
+    total_ss = sums["y_sq_sum"] - np.square(sums["y_sum"]) / count
+    report = pd.DataFrame(
+        {
+            "samples": count.astype(int),
+            "mae": sums["abs_error"] / count,
+            "rmse": np.sqrt(sums["sq_error"] / count),
+            "r2": (1.0 - sums["sq_error"] / total_ss).where((count > 1) & (total_ss > 0)),
+        }
+    )
+    log.info("Computed slice metrics (files={}, slices={})", len(files), len(report))
+    return report.reset_index()
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -92,13 +350,66 @@ def main(argv: list[str] | None = None) -> int:
         default=REPORTS_DIR / "evaluation.json",
         help="Output path for evaluation metrics",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Stream the data in batches of this many rows (bounded memory)",
+    )
+    parser.add_argument(
+        "--slices",
+        action="store_true",
+        help="Also write per-slice metrics (hour, weekday, pickup zone, airport, distance)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes for slice metrics when --data is a directory of files",
+    )
+    parser.add_argument(
+        "--predictions-cache",
+        type=Path,
+        nargs="?",
+        const=RUN_DIR / "cache" / "predictions",
+        default=None,
+        help="Cache predictions as parquet keyed by model and data content hash "
+        "(default dir: .run/cache/predictions; off unless given)",
+    )
+    parser.add_argument(
+        "--partition-filter",
+        action="append",
+        default=None,
+        metavar="KEY=VALUE[,VALUE]",
+        help="Evaluate only matching partitions/row groups of a parquet dataset "
+        "(e.g. year=2024, month=1,2; repeatable)",
+    )
     args = parser.parse_args(argv)
+    partition_filter = parse_partition_filter(args.partition_filter) or None
 
     log.info("Starting evaluation")
-    metrics = evaluate_model(args.data, args.model)
+    metrics = evaluate_model(
+        args.data,
+        args.model,
+        batch_size=args.batch_size,
+        predictions_cache=args.predictions_cache,
+        partition_filter=partition_filter,
+    )
     args.output.parent.mkdir(parents=True, exist_ok=True)
     args.output.write_text(json.dumps(metrics, indent=2))
     log.info("Saved evaluation metrics to {}", args.output)
+    if args.slices:
+        slices_out = args.output.with_name(f"{args.output.stem}_slices.json")
+        report = slice_metrics(
+            args.data,
+            args.model,
+            args.workers,
+            args.batch_size,
+            args.predictions_cache,
+            partition_filter,
+        )
+        slices_out.write_text(report.to_json(orient="records", indent=2))
+        log.info("Saved slice metrics to {}", slices_out)
     return 0
 
 
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+PREDICTION_COLUMN = "prediction"
+_KEY_CHARS = 16
+
+
+def content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_key(model_path: Path) -> str:
+    # Computed once per evaluation and passed to predictions_path for every data file.
+    return content_hash(model_path)[:_KEY_CHARS]
+
+
+def predictions_path(cache_dir: Path, model_key: str, data_path: Path, variant: str = "") -> Path:
+    # Keyed by content, not names: retraining or rewriting the data invalidates the entry,
+    # renaming or copying either file does not. ``variant`` distinguishes row subsets of
+    # the same file (e.g. a row filter), which need their own predictions.
+    data_key = content_hash(data_path)
+    if variant:
+        data_key = hashlib.sha256(f"{data_key}:{variant}".encode()).hexdigest()
+    data_key = data_key[:_KEY_CHARS]
+    return cache_dir / f"{model_key}-{data_key}.parquet"
+
+
+class PredictionReader:
+    """Hands out cached predictions in row order, in whatever batch sizes the data uses."""
+
+    def __init__(self, path: Path) -> None:
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self._batches = pq.ParquetFile(path).iter_batches(columns=[PREDICTION_COLUMN])
+        self._buffer = np.empty(0, dtype=np.float64)
+
+    def take(self, count: int) -> np.ndarray:
+        parts = []
+        while count > 0:
+            if not self._buffer.size:
+                batch = next(self._batches, None)
+                if batch is None:
+                    raise ValueError(f"Cached predictions shorter than data: {self.path}")
+                self._buffer = batch.column(0).to_numpy()
+                continue
+            part = self._buffer[:count]
+            self._buffer = self._buffer[count:]
+            parts.append(part)
+            count -= len(part)
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+
+    def finish(self) -> None:
+        if self._buffer.size or next(self._batches, None) is not None:
+            raise ValueError(f"Cached predictions longer than data: {self.path}")
+
+
+class PredictionWriter:
+    """Streams predictions to a temp file and publishes it atomically on close."""
+
+    def __init__(self, path: Path) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        self._pa = pa
+        self._writer = pq.ParquetWriter(
+            self._tmp, pa.schema([(PREDICTION_COLUMN, pa.float64())]), compression="zstd"
+        )
+
+    def write(self, preds: np.ndarray) -> None:
+        column = self._pa.array(np.asarray(preds, dtype=np.float64))
+        self._writer.write_table(self._pa.table({PREDICTION_COLUMN: column}))
+
+    def close(self) -> None:
+        self._writer.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        self._writer.close()
+        self._tmp.unlink(missing_ok=True)
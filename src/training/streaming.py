@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HASH_BUCKETS = 10_000
+_SEED_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _infer_format(path: Path) -> str:
+    if path.is_dir():
+        return "parquet"
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        return "parquet"
+    if suffix == ".csv":
+        return "csv"
+    raise ValueError(f"Unsupported data format: {suffix}")
+
+
+def parse_partition_filter(specs: Iterable[str] | None) -> dict[str, list[str]]:
+    """``["year=2024", "month=1,2"]`` -> ``{"year": ["2024"], "month": ["1", "2"]}``."""
+    partition_filter: dict[str, list[str]] = {}
+    for spec in specs or []:
+        key, sep, values = spec.partition("=")
+        if not sep or not key.strip() or not values.strip():
+            raise ValueError(f"Invalid partition filter: {spec!r} (expected key=value[,value])")
+        partition_filter.setdefault(key.strip(), []).extend(
+            value.strip() for value in values.split(",") if value.strip()
+        )
+    return partition_filter
+
+
+def partition_values(path: Path) -> dict[str, str]:
+    return dict(part.split("=", 1) for part in path.parts if "=" in part)
+
+
+def matches_partition(path: Path, partition_filter: dict[str, list[str]] | None) -> bool:
+    # Keys missing from the path are column filters and are applied when reading.
+    values = partition_values(path)
+    return all(
+        values[key] in allowed for key, allowed in (partition_filter or {}).items() if key in values
+    )
+
+
+def row_filter(
+    path: Path, partition_filter: dict[str, list[str]] | None
+) -> dict[str, list[str]] | None:
+    """The part of a filter a single file still has to apply to its rows."""
+    values = partition_values(path)
+    remaining = {
+        key: allowed for key, allowed in (partition_filter or {}).items() if key not in values
+    }
+    return remaining or None
+
+
+def _parquet_dataset(path: Path, partition_filter: dict[str, list[str]] | None = None):
+    # Hive keys (year=/month=/...) are only used for pruning; the data columns are the ones
+    # physically stored in the files.
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if not path.is_dir():
+        partition_keys: set[str] = set()
+        dataset = ds.dataset(path, format="parquet")
+    else:
+        dataset = ds.dataset(path, format="parquet", partitioning="hive")
+        partition_keys = {
+            key
+            for file in dataset.files
+            for key in partition_values(Path(os.path.relpath(file, path)))
+        }
+    columns = [name for name in dataset.schema.names if name not in partition_keys]
+    # Partition keys prune whole directories; data columns are checked against row-group
+    # min/max statistics before any rows are decoded.
+    expression = None
+    for key, values in (partition_filter or {}).items():
+        if key not in partition_keys and key not in columns:
+            raise ValueError(f"Unknown partition key or column: {key}")
+        allowed = pa.array(values).cast(dataset.schema.field(key).type)
+        condition = ds.field(key).isin(allowed)
+        expression = condition if expression is None else expression & condition
+    return dataset, columns, expression
+
+
+def read_columns(path: Path) -> list[str]:
+    if _infer_format(path) == "parquet":
+        return _parquet_dataset(path)[1]
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_table(
+    path: Path,
+    columns: list[str] | None = None,
+    partition_filter: dict[str, list[str]] | None = None,
+) -> pd.DataFrame:
+    if _infer_format(path) == "parquet":
+        dataset, physical, expression = _parquet_dataset(path, partition_filter)
+        return dataset.to_table(columns=columns or physical, filter=expression).to_pandas()
+    if partition_filter:
+        raise ValueError("Partition filters require parquet input.")
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_batches(
+    path: Path,
+    batch_size: int,
+    columns: list[str] | None = None,
+    partition_filter: dict[str, list[str]] | None = None,
+) -> Iterator[pd.DataFrame]:
+    if _infer_format(path) == "parquet":
+        dataset, physical, expression = _parquet_dataset(path, partition_filter)
+        batches = dataset.to_batches(
+            columns=columns or physical, filter=expression, batch_size=batch_size
+        )
+        for batch in batches:
+            if batch.num_rows:
+                yield batch.to_pandas()
+        return
+    if partition_filter:
+        raise ValueError("Partition filters require parquet input.")
+    yield from pd.read_csv(path, usecols=columns, chunksize=batch_size)
+
+
+def hash_split(df: pd.DataFrame, test_size: float, random_state: int) -> np.ndarray:
+    # Row-content hashing keeps the split identical across chunk sizes and passes.
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    with np.errstate(over="ignore"):
+        mixed = hashes + np.uint64(random_state) * _SEED_MIX
+    return (mixed % np.uint64(HASH_BUCKETS)) < np.uint64(round(test_size * HASH_BUCKETS))
+
+
+class StreamingMetrics:
+    def __init__(self) -> None:
+        self.count = 0
+        self.abs_error = 0.0
+        self.sq_error = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, y_true, y_pred) -> None:
+        y_true = np.asarray(y_true, dtype=np.float64)
+        y_pred = np.asarray(y_pred, dtype=np.float64)
+        if y_true.size == 0:
+            return
+        errors = y_true - y_pred
+        self.abs_error += float(np.abs(errors).sum())
+        self.sq_error += float(np.square(errors).sum())
+
+        # Chan et al. parallel update of the target mean and sum of squares (Welford).
+        batch_count = y_true.size
+        batch_mean = float(y_true.mean())
+        batch_m2 = float(np.square(y_true - batch_mean).sum())
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        self.mean += delta * batch_count / total
+        self.m2 += batch_m2 + delta * delta * self.count * batch_count / total
+        self.count = total
+
+    def result(self) -> dict:
+        if self.count == 0:
+            return {"mae": float("nan"), "rmse": float("nan"), "r2": float("nan"), "samples": 0}
+        if self.m2 > 0:
+            r2 = 1.0 - self.sq_error / self.m2
+        else:
+            r2 = 1.0 if self.sq_error == 0 else 0.0
+        if self.count < 2:
+            r2 = float("nan")
+        return {
+            "mae": self.abs_error / self.count,
+            "rmse": (self.sq_error / self.count) ** 0.5,
+            "r2": r2,
+            "samples": int(self.count),
+        }
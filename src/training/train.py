@@ -1,24 +1,57 @@
 from __future__ import annotations
 
 import argparse
+import io
 import json
 import os
+import resource
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import joblib
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.linear_model import ElasticNet
+from joblib import Memory
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.linear_model import ElasticNet, SGDRegressor, enet_path
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.model_selection import (
+    GridSearchCV,
+    HalvingGridSearchCV,
+    KFold,
+    ParameterGrid,
+    RandomizedSearchCV,
+    train_test_split,
+)
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
+from sklearn.preprocessing import OrdinalEncoder, StandardScaler
+from threadpoolctl import threadpool_limits
 
 from config.logging import configure_logging, log
-from config.paths import REPORTS_DIR
+from config.paths import REPORTS_DIR, RUN_DIR
+from training.streaming import (
+    StreamingMetrics,
+    hash_split,
+    iter_batches,
+    parse_partition_filter,
+    read_columns,
+    read_table,
+)
 
 configure_logging()
 
+PARALLEL_STRATEGIES = ("search", "estimator")
+SEARCH_MODES = ("grid", "halving", "random")
+DEFAULT_SEARCH_BUDGET = 6
+CATEGORICAL_FEATURES = ("PULocationID", "DOLocationID")
+LATENCY_REPEATS = 200
+LATENCY_BATCH_ROWS = 1000
+
 
 def _infer_format(path: Path) -> str:
     suffix = path.suffix.lower()
@@ -29,7 +62,9 @@ def _infer_format(path: Path) -> str:
     raise ValueError(f"Unsupported data format: {suffix}")
 
 
-def _load_data(path: Path) -> pd.DataFrame:
+def _load_data(path: Path, partition_filter: dict[str, list[str]] | None = None) -> pd.DataFrame:
+    if path.is_dir() or partition_filter:
+        return read_table(path, partition_filter=partition_filter)
     fmt = _infer_format(path)
     if fmt == "parquet":
         return pd.read_parquet(path)
@@ -48,22 +83,335 @@ def _compute_metrics(y_true, y_pred) -> dict:
     }
 
 
-def _fit_model(name: str, pipeline: Pipeline, param_grid: dict, X_train, y_train) -> dict:
+def _save_bundle(model_bundle: dict, model_out: Path, compress: int) -> None:
+    # Write to a sibling file and rename so readers (hot reload, memory-mapped
+    # workers) never see a truncated or rewritten-in-place bundle.
+    tmp_path = model_out.with_name(f".{model_out.name}.tmp")
+    joblib.dump(model_bundle, tmp_path, compress=compress)
+    os.replace(tmp_path, model_out)
+
+
+def _resolve_n_jobs(n_jobs: int | None) -> int:
+    if n_jobs is None:
+        n_jobs = int(os.getenv("TRAIN_N_JOBS", "1"))
+    if n_jobs < 0:
+        n_jobs = max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+def _allocate_jobs(n_jobs: int, heavy: list[bool]) -> list[int]:
+    # Light candidates run on one core; heavy ones split whatever is left. With fewer cores
+    # than candidates each gets one and _fit_candidates runs n_jobs of them at a time, so
+    # the concurrent total never exceeds n_jobs.
+    n_heavy = sum(heavy)
+    if n_heavy == 0 or n_jobs <= len(heavy):
+        return [1] * len(heavy)
+    spare = n_jobs - (len(heavy) - n_heavy)
+    shares = [spare // n_heavy + (1 if idx < spare % n_heavy else 0) for idx in range(n_heavy)]
+    allocation = []
+    for is_heavy in heavy:
+        allocation.append(shares.pop(0) if is_heavy else 1)
+    return allocation
+
+
+def _build_search(
+    pipeline: Pipeline,
+    param_grid: dict,
+    cv: int,
+    n_jobs: int,
+    search: str,
+    budget: int | None,
+    random_state: int,
+):
+    common = {"cv": cv, "scoring": "neg_mean_absolute_error", "n_jobs": n_jobs}
+    if search == "halving":
+        return HalvingGridSearchCV(
+            pipeline,
+            param_grid=param_grid,
+            factor=3,
+            resource="n_samples",
+            min_resources="exhaust",
+            random_state=random_state,
+            **common,
+        )
+    if search == "random":
+        n_configs = len(ParameterGrid(param_grid))
+        return RandomizedSearchCV(
+            pipeline,
+            param_distributions=param_grid,
+            n_iter=min(budget or DEFAULT_SEARCH_BUDGET, n_configs),
+            random_state=random_state,
+            **common,
+        )
+    return GridSearchCV(pipeline, param_grid=param_grid, **common)
+
+
+def _search_compute(search_cv, cv: int, n_train: int) -> dict:
+    results = search_cv.cv_results_
+    n_resources = results.get("n_resources")
+    if n_resources is None:
+        n_resources = [n_train] * len(results["params"])
+    compute = {
+        "configs": len({str(params) for params in results["params"]}),
+        "fits": len(results["params"]) * cv,
+        # Rows seen by CV fits: each evaluation trains cv folds of (cv-1)/cv of its rows.
+        "sample_fits": int(sum(n_resources) * (cv - 1)),
+    }
+    if hasattr(search_cv, "n_iterations_"):
+        compute["iterations"] = int(search_cv.n_iterations_)
+        compute["n_candidates"] = [int(value) for value in search_cv.n_candidates_]
+        compute["n_resources"] = [int(value) for value in search_cv.n_resources_]
+    return compute
+
+
+def _estimator_threads(pipeline: Pipeline) -> str | None:
+    # How the final estimator parallelises itself: joblib n_jobs or OpenMP threads.
+    model = pipeline.steps[-1][1]
+    if "n_jobs" in model.get_params():
+        return "n_jobs"
+    if isinstance(model, HistGradientBoostingRegressor):
+        return "openmp"
+    return None
+
+
+def _build_hist_gb_pipeline(features: list[str], random_state: int) -> Pipeline:
+    # Location IDs go up to 265, above HistGradientBoosting's 255-category limit, so they
+    # are ordinal-encoded with the rarest zones folded into one infrequent category.
+    # Positional column selection keeps the pipeline usable with plain NumPy rows.
+    categorical = [idx for idx, name in enumerate(features) if name in CATEGORICAL_FEATURES]
+    model = HistGradientBoostingRegressor(
+        categorical_features=list(range(len(categorical))) or None,
+        random_state=random_state,
+    )
+    if not categorical:
+        return Pipeline([("model", model)])
+    encoder = ColumnTransformer(
+        [
+            (
+                "locations",
+                OrdinalEncoder(
+                    handle_unknown="use_encoded_value",
+                    unknown_value=-1,
+                    max_categories=255,
+                    dtype=np.float64,
+                ),
+                categorical,
+            )
+        ],
+        remainder="passthrough",
+    )
+    return Pipeline([("encode", encoder), ("model", model)])
+
+
+def _timed(fn, repeats: int) -> np.ndarray:
+    fn()
+    timings = np.empty(repeats)
+    for idx in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings[idx] = time.perf_counter() - start
+    return timings * 1000
+
+
+def _profile_candidate(estimator, X_sample: pd.DataFrame, repeats: int = LATENCY_REPEATS) -> dict:
+    # Serving scores float64 ndarrays (api.inference.CompiledPredictor), so time that path.
+    X = np.ascontiguousarray(X_sample.to_numpy(dtype=np.float64))
+    row = X[:1]
+    batch = X[:LATENCY_BATCH_ROWS]
+    payload = io.BytesIO()
+    joblib.dump(estimator, payload)
+
+    def load() -> None:
+        payload.seek(0)
+        joblib.load(payload)
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        single = _timed(lambda: estimator.predict(row), repeats)
+        batched = _timed(lambda: estimator.predict(batch), max(5, repeats // 10))
+    loads = _timed(load, 3)
+    return {
+        "size_bytes": payload.getbuffer().nbytes,
+        "load_ms": float(np.median(loads)),
+        "predict_single_ms_p50": float(np.percentile(single, 50)),
+        "predict_single_ms_p99": float(np.percentile(single, 99)),
+        "predict_batch_rows": len(batch),
+        "predict_batch_ms_p50": float(np.percentile(batched, 50)),
+        "predict_batch_ms_p99": float(np.percentile(batched, 99)),
+    }
+
+
+def _resolve_policy(max_latency_ms: float | None, max_size_mb: float | None) -> dict:
+    if max_latency_ms is None and os.getenv("TRAIN_MAX_LATENCY_MS"):
+        max_latency_ms = float(os.getenv("TRAIN_MAX_LATENCY_MS"))
+    if max_size_mb is None and os.getenv("TRAIN_MAX_SIZE_MB"):
+        max_size_mb = float(os.getenv("TRAIN_MAX_SIZE_MB"))
+    return {"max_latency_ms": max_latency_ms, "max_size_mb": max_size_mb}
+
+
+def _policy_violations(report: dict, policy: dict) -> list[str]:
+    violations = []
+    if policy["max_latency_ms"] is not None:
+        if report["predict_single_ms_p99"] > policy["max_latency_ms"]:
+            violations.append("latency")
+    if policy["max_size_mb"] is not None:
+        if report["size_bytes"] > policy["max_size_mb"] * 1024 * 1024:
+            violations.append("size")
+    return violations
+
+
+def _select_candidate(report: dict[str, dict], policy: dict) -> tuple[str, bool]:
+    # Best test MAE among candidates within the latency/size budget; when none fits, fall
+    # back to the best MAE overall so training still produces a model.
+    eligible = [name for name, entry in report.items() if not entry["violations"]]
+    pool = eligible or list(report)
+    best = min(pool, key=lambda name: report[name]["test_mae"])
+    return best, not eligible
+
+
+def _fit_elastic_path(pipeline: Pipeline, param_grid: dict, X_train, y_train, cv: int):
+    # One enet_path per (fold, l1_ratio) with warm starts along alpha replaces a full
+    # ElasticNet fit per grid point. Folds and the MAE criterion match GridSearchCV.
+    alphas = sorted(param_grid["model__alpha"], reverse=True)
+    l1_ratios = list(param_grid["model__l1_ratio"])
+    model = pipeline.named_steps["model"]
+    X_values = np.asarray(X_train, dtype=np.float64)
+    y_values = np.asarray(y_train, dtype=np.float64)
+
+    mae = np.zeros((len(l1_ratios), len(alphas)))
+    path_fits = 0
+    sample_fits = 0
+    for train_idx, val_idx in KFold(n_splits=cv).split(X_values):
+        scaler = clone(pipeline.named_steps["scaler"]).fit(X_values[train_idx])
+        X_fold = scaler.transform(X_values[train_idx])
+        X_val = scaler.transform(X_values[val_idx])
+        y_fold = y_values[train_idx]
+        y_offset = y_fold.mean()
+        x_offset = X_fold.mean(axis=0)
+        for idx, l1_ratio in enumerate(l1_ratios):
+            _, coefs, _ = enet_path(
+                X_fold - x_offset,
+                y_fold - y_offset,
+                l1_ratio=l1_ratio,
+                alphas=alphas,
+                max_iter=model.max_iter,
+                tol=model.tol,
+            )
+            preds = (X_val - x_offset) @ coefs + y_offset
+            mae[idx] += np.abs(preds - y_values[val_idx, None]).mean(axis=0) / cv
+            path_fits += 1
+            sample_fits += len(train_idx)
+
+    best_l1, best_alpha = np.unravel_index(np.argmin(mae), mae.shape)
+    params = {"model__alpha": alphas[best_alpha], "model__l1_ratio": l1_ratios[best_l1]}
+    estimator = clone(pipeline).set_params(**params).fit(X_train, y_train)
+    compute = {
+        "configs": len(alphas) * len(l1_ratios),
+        "fits": path_fits,
+        "sample_fits": sample_fits,
+        "regularization_path": True,
+    }
+    return estimator, params, compute
+
+
+def _fit_model(
+    name: str,
+    pipeline: Pipeline,
+    param_grid: dict,
+    X_train,
+    y_train,
+    n_jobs: int = 1,
+    strategy: str = "search",
+    search: str = "grid",
+    budget: int | None = None,
+    random_state: int = 42,
+    regularization_path: bool = False,
+) -> dict:
+    start = time.perf_counter()
+    search_jobs = n_jobs
+    threads = _estimator_threads(pipeline)
+    if strategy == "estimator" and threads:
+        if threads == "n_jobs":
+            pipeline.set_params(model__n_jobs=n_jobs)
+        search_jobs = 1
+
     cv = min(3, len(X_train))
     if cv < 2:
         pipeline.fit(X_train, y_train)
         log.info("Using default params for {} (insufficient samples for CV)", name)
-        return {"name": name, "estimator": pipeline, "params": {}}
-    search = GridSearchCV(
-        pipeline,
-        param_grid=param_grid,
-        cv=cv,
-        scoring="neg_mean_absolute_error",
-        n_jobs=1,
-    )
-    search.fit(X_train, y_train)
-    log.info("Best {} params: {}", name, search.best_params_)
-    return {"name": name, "estimator": search.best_estimator_, "params": search.best_params_}
+        estimator, params = pipeline, {}
+        compute = {"configs": 1, "fits": 1, "sample_fits": int(len(X_train))}
+    elif regularization_path and search == "grid":
+        estimator, params, compute = _fit_elastic_path(pipeline, param_grid, X_train, y_train, cv)
+        log.info("Best {} params: {}", name, params)
+    else:
+        search_cv = _build_search(
+            pipeline, param_grid, cv, search_jobs, search, budget, random_state
+        )
+        search_cv.fit(X_train, y_train)
+        log.info("Best {} params: {}", name, search_cv.best_params_)
+        estimator, params = search_cv.best_estimator_, search_cv.best_params_
+        compute = _search_compute(search_cv, cv, len(X_train))
+
+    if "model__n_jobs" in estimator.get_params():
+        estimator.set_params(model__n_jobs=1)
+    if isinstance(estimator, Pipeline):
+        estimator.set_params(memory=None)
+    seconds = time.perf_counter() - start
+    log.info("Fitted {} in {:.1f}s (n_jobs={}, strategy={})", name, seconds, n_jobs, strategy)
+    return {
+        "name": name,
+        "estimator": estimator,
+        "params": params,
+        "fit_seconds": seconds,
+        "n_jobs": n_jobs,
+        "compute": compute,
+    }
+
+
+def _fit_candidates(
+    specs: list[dict],
+    X_train,
+    y_train,
+    n_jobs: int,
+    strategy: str,
+    search: str = "grid",
+    budget: int | None = None,
+    random_state: int = 42,
+) -> list[dict]:
+    allocation = _allocate_jobs(n_jobs, [spec["heavy"] for spec in specs])
+
+    def fit(spec: dict, jobs: int) -> dict:
+        return _fit_model(
+            spec["name"],
+            spec["pipeline"],
+            spec["params"],
+            X_train,
+            y_train,
+            n_jobs=jobs,
+            strategy=strategy,
+            search=search,
+            budget=budget,
+            random_state=random_state,
+            regularization_path=spec.get("regularization_path", False),
+        )
+
+    # OpenMP estimators (HistGradientBoosting) take their share of the core budget here;
+    # the limit is process-wide, so use the largest OpenMP allocation.
+    openmp_jobs = [
+        jobs
+        for spec, jobs in zip(specs, allocation, strict=True)
+        if _estimator_threads(spec["pipeline"]) == "openmp"
+    ]
+    with threadpool_limits(limits=max(openmp_jobs, default=n_jobs), user_api="openmp"):
+        if n_jobs == 1:
+            return [fit(spec, 1) for spec in specs]
+        workers = min(len(specs), n_jobs)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fit") as pool:
+            futures = [
+                pool.submit(fit, spec, jobs) for spec, jobs in zip(specs, allocation, strict=True)
+            ]
+            return [future.result() for future in futures]
 
 
 def train_model(
@@ -73,11 +421,28 @@ def train_model(
     target: str = "trip_duration",
     test_size: float = 0.2,
     random_state: int = 42,
+    compress: int = 0,
+    n_jobs: int | None = None,
+    parallel_strategy: str | None = None,
+    search: str = "grid",
+    search_budget: int | None = None,
+    pipeline_cache: Path | None = None,
+    max_latency_ms: float | None = None,
+    max_size_mb: float | None = None,
+    partition_filter: dict[str, list[str]] | None = None,
 ) -> dict:
     if not data_path.exists():
         raise FileNotFoundError(f"Data file not found: {data_path}")
-
-    df = _load_data(data_path)
+    run_start = time.perf_counter()
+    policy = _resolve_policy(max_latency_ms, max_size_mb)
+    n_jobs = _resolve_n_jobs(n_jobs)
+    strategy = parallel_strategy or os.getenv("TRAIN_PARALLEL_STRATEGY", "search")
+    if strategy not in PARALLEL_STRATEGIES:
+        raise ValueError(f"Unsupported parallel strategy: {strategy}")
+    if search not in SEARCH_MODES:
+        raise ValueError(f"Unsupported search mode: {search}")
+
+    df = _load_data(data_path, partition_filter)
     running_tests = "PYTEST_CURRENT_TEST" in os.environ
     if running_tests and len(df) > 2000:
         df = df.sample(n=2000, random_state=random_state)
@@ -93,11 +458,13 @@ def train_model(
         X, y, test_size=test_size, random_state=random_state
     )
 
+    memory = Memory(pipeline_cache, verbose=0) if pipeline_cache else None
     elastic_pipeline = Pipeline(
         [
             ("scaler", StandardScaler()),
             ("model", ElasticNet(max_iter=5000, random_state=random_state)),
-        ]
+        ],
+        memory=memory,
     )
     if running_tests:
         elastic_params = {"model__alpha": [0.1], "model__l1_ratio": [0.5]}
@@ -129,22 +496,68 @@ def train_model(
             "model__min_samples_leaf": [1, 2],
         }
 
-    candidates = [
-        _fit_model("elastic_net", elastic_pipeline, elastic_params, X_train, y_train),
-        _fit_model("random_forest", rf_pipeline, rf_params, X_train, y_train),
+    hist_gb_pipeline = _build_hist_gb_pipeline(features, random_state)
+    if running_tests:
+        hist_gb_params = {"model__max_iter": [50], "model__learning_rate": [0.1]}
+    else:
+        hist_gb_params = {
+            "model__learning_rate": [0.05, 0.1],
+            "model__max_leaf_nodes": [31, 63],
+            "model__min_samples_leaf": [20, 50],
+        }
+
+    specs = [
+        {
+            "name": "elastic_net",
+            "pipeline": elastic_pipeline,
+            "params": elastic_params,
+            "heavy": False,
+            "regularization_path": True,
+        },
+        {"name": "random_forest", "pipeline": rf_pipeline, "params": rf_params, "heavy": True},
+        {
+            "name": "hist_gradient_boosting",
+            "pipeline": hist_gb_pipeline,
+            "params": hist_gb_params,
+            "heavy": True,
+        },
     ]
+    fit_start = time.perf_counter()
+    candidates = _fit_candidates(
+        specs,
+        X_train,
+        y_train,
+        n_jobs,
+        strategy,
+        search=search,
+        budget=search_budget,
+        random_state=random_state,
+    )
+    fit_seconds = time.perf_counter() - fit_start
 
-    best = None
-    best_score = float("inf")
+    if not candidates:
+        raise RuntimeError("Model training failed to produce a candidate.")
+
+    repeats = 20 if running_tests else LATENCY_REPEATS
+    candidate_report = {}
     for candidate in candidates:
         preds = candidate["estimator"].predict(X_test)
-        mae = mean_absolute_error(y_test, preds)
-        if mae < best_score:
-            best_score = mae
-            best = candidate
-
-    if best is None:
-        raise RuntimeError("Model training failed to produce a candidate.")
+        entry = {"test_mae": float(mean_absolute_error(y_test, preds))}
+        entry.update(_profile_candidate(candidate["estimator"], X_test, repeats))
+        entry["violations"] = _policy_violations(entry, policy)
+        candidate_report[candidate["name"]] = entry
+        log.info(
+            "Candidate {}: MAE={:.3f}, p99={:.3f} ms, size={:.1f} MB",
+            candidate["name"],
+            entry["test_mae"],
+            entry["predict_single_ms_p99"],
+            entry["size_bytes"] / 1024 / 1024,
+        )
+
+    best_name, fallback = _select_candidate(candidate_report, policy)
+    if fallback:
+        log.warning("No candidate satisfies selection policy {}; using best MAE", policy)
+    best = next(candidate for candidate in candidates if candidate["name"] == best_name)
 
     train_preds = best["estimator"].predict(X_train)
     test_preds = best["estimator"].predict(X_test)
@@ -159,11 +572,12 @@ def train_model(
         "target": target,
         "model_type": best["name"],
         "params": best["params"],
+        "mmap_compatible": compress == 0,
     }
 
     model_out.parent.mkdir(parents=True, exist_ok=True)
     metrics_out.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(model_bundle, model_out)
+    _save_bundle(model_bundle, model_out, compress)
 
     metrics_payload = {
         "model_type": best["name"],
@@ -172,7 +586,26 @@ def train_model(
         "features": features,
         "target": target,
         "samples": {"train": int(len(y_train)), "test": int(len(y_test))},
+        "candidates": candidate_report,
+        "selection": {"policy": policy, "selected": best_name, "fallback": fallback},
+        "parallelism": {"n_jobs": n_jobs, "strategy": strategy},
+        "search": {
+            "strategy": search,
+            "budget": (search_budget or DEFAULT_SEARCH_BUDGET) if search == "random" else None,
+            "candidates": {candidate["name"]: candidate["compute"] for candidate in candidates},
+        },
+        "timing": {
+            "fit_seconds": fit_seconds,
+            "candidates": {
+                candidate["name"]: {
+                    "fit_seconds": candidate["fit_seconds"],
+                    "n_jobs": candidate["n_jobs"],
+                }
+                for candidate in candidates
+            },
+        },
     }
+    metrics_payload["timing"]["total_seconds"] = time.perf_counter() - run_start
     metrics_out.write_text(json.dumps(metrics_payload, indent=2))
 
     log.info("Saved model to {}", model_out)
@@ -180,6 +613,95 @@ def train_model(
     return metrics_payload
 
 
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def train_model_streaming(
+    data_path: Path,
+    model_out: Path,
+    metrics_out: Path,
+    target: str = "trip_duration",
+    test_size: float = 0.2,
+    random_state: int = 42,
+    compress: int = 0,
+    batch_size: int = 100_000,
+    epochs: int = 1,
+    partition_filter: dict[str, list[str]] | None = None,
+) -> dict:
+    if not data_path.exists():
+        raise FileNotFoundError(f"Data file not found: {data_path}")
+    run_start = time.perf_counter()
+    columns = read_columns(data_path)
+    if target not in columns:
+        raise ValueError(f"Missing target column: {target}")
+    features = [col for col in columns if col != target]
+
+    def split_batches(train: bool):
+        for batch in iter_batches(data_path, batch_size, features + [target], partition_filter):
+            batch = batch.dropna()
+            is_test = hash_split(batch, test_size, random_state)
+            part = batch[~is_test] if train else batch[is_test]
+            if len(part):
+                yield part[features], part[target]
+
+    scaler = StandardScaler()
+    batches = 0
+    for X_batch, _ in split_batches(train=True):
+        scaler.partial_fit(X_batch)
+        batches += 1
+    if batches == 0:
+        raise ValueError("No training rows after split.")
+
+    model = SGDRegressor(random_state=random_state, learning_rate="invscaling", eta0=0.01)
+    for epoch in range(epochs):
+        for X_batch, y_batch in split_batches(train=True):
+            model.partial_fit(scaler.transform(X_batch), y_batch.to_numpy())
+        log.info("Completed streaming epoch {}/{}", epoch + 1, epochs)
+
+    pipeline = Pipeline([("scaler", scaler), ("model", model)])
+    train_metrics = StreamingMetrics()
+    test_metrics = StreamingMetrics()
+    for X_batch, y_batch in split_batches(train=True):
+        train_metrics.update(y_batch, pipeline.predict(X_batch))
+    for X_batch, y_batch in split_batches(train=False):
+        test_metrics.update(y_batch, pipeline.predict(X_batch))
+
+    params = {"batch_size": batch_size, "epochs": epochs, "loss": model.loss}
+    model_bundle = {
+        "model": pipeline,
+        "features": features,
+        "target": target,
+        "model_type": "sgd_streaming",
+        "params": params,
+        "mmap_compatible": compress == 0,
+    }
+    model_out.parent.mkdir(parents=True, exist_ok=True)
+    metrics_out.parent.mkdir(parents=True, exist_ok=True)
+    _save_bundle(model_bundle, model_out, compress)
+
+    metrics_payload = {
+        "model_type": "sgd_streaming",
+        "params": params,
+        "metrics": {"train": train_metrics.result(), "test": test_metrics.result()},
+        "features": features,
+        "target": target,
+        "samples": {"train": train_metrics.count, "test": test_metrics.count},
+        "streaming": {
+            "batches_per_pass": batches,
+            "split": "hash",
+            "peak_rss_mb": _peak_rss_mb(),
+        },
+        "timing": {"total_seconds": time.perf_counter() - run_start},
+    }
+    metrics_out.write_text(json.dumps(metrics_payload, indent=2))
+
+    log.info("Saved streaming model to {}", model_out)
+    log.info("Saved metrics to {}", metrics_out)
+    return metrics_payload
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Train ML models and select the best.")
     parser.add_argument(
@@ -217,11 +739,112 @@ def main(argv: list[str] | None = None) -> int:
         default=42,
         help="Random state for reproducibility",
     )
+    parser.add_argument(
+        "--compress",
+        type=int,
+        default=0,
+        choices=range(10),
+        metavar="{0-9}",
+        help="joblib compression level for the model bundle (0 keeps it memory-mappable)",
+    )
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=None,
+        help="CPU cores for training (-1 = all; default: TRAIN_N_JOBS or 1)",
+    )
+    parser.add_argument(
+        "--parallel-strategy",
+        choices=PARALLEL_STRATEGIES,
+        default=None,
+        help="Parallelise the CV search or the estimator itself "
+        "(default: TRAIN_PARALLEL_STRATEGY or search)",
+    )
+    parser.add_argument(
+        "--search",
+        choices=SEARCH_MODES,
+        default="grid",
+        help="Hyperparameter search: exhaustive grid, successive halving on row subsets, "
+        "or a random budgeted subset of the grid",
+    )
+    parser.add_argument(
+        "--search-budget",
+        type=int,
+        default=None,
+        help=f"Configurations per model for --search random (default: {DEFAULT_SEARCH_BUDGET})",
+    )
+    parser.add_argument(
+        "--pipeline-cache",
+        type=Path,
+        default=RUN_DIR / "cache" / "pipeline",
+        help="joblib Memory dir caching fitted transformers across CV fits",
+    )
+    parser.add_argument(
+        "--no-pipeline-cache",
+        dest="pipeline_cache",
+        action="store_const",
+        const=None,
+        help="Disable transformer caching",
+    )
+    parser.add_argument(
+        "--max-latency-ms",
+        type=float,
+        default=None,
+        help="Only select candidates whose single-row p99 predict latency is below this "
+        "(default: TRAIN_MAX_LATENCY_MS or unlimited)",
+    )
+    parser.add_argument(
+        "--max-size-mb",
+        type=float,
+        default=None,
+        help="Only select candidates whose serialized size is below this "
+        "(default: TRAIN_MAX_SIZE_MB or unlimited)",
+    )
+    parser.add_argument(
+        "--partition-filter",
+        action="append",
+        default=None,
+        metavar="KEY=VALUE[,VALUE]",
+        help="Read only matching partitions/row groups of a parquet dataset "
+        "(e.g. year=2024, month=1,2; repeatable)",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Out-of-core training: stream batches into an incremental SGD regressor",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100_000,
+        help="Rows per batch for --streaming",
+    )
+    parser.add_argument(
+        "--epochs",
+        type=int,
+        default=1,
+        help="Passes over the training rows for --streaming",
+    )
 
     args = parser.parse_args(argv)
 
     log.info("Starting training run")
     log.debug("Args: {}", args)
+    partition_filter = parse_partition_filter(args.partition_filter) or None
+    if args.streaming:
+        train_model_streaming(
+            data_path=args.data,
+            model_out=args.model_out,
+            metrics_out=args.metrics_out,
+            target=args.target,
+            test_size=args.test_size,
+            random_state=args.random_state,
+            compress=args.compress,
+            batch_size=args.batch_size,
+            epochs=args.epochs,
+            partition_filter=partition_filter,
+        )
+        return 0
     train_model(
         data_path=args.data,
         model_out=args.model_out,
@@ -229,6 +852,15 @@ def main(argv: list[str] | None = None) -> int:
         target=args.target,
         test_size=args.test_size,
         random_state=args.random_state,
+        compress=args.compress,
+        n_jobs=args.n_jobs,
+        parallel_strategy=args.parallel_strategy,
+        search=args.search,
+        search_budget=args.search_budget,
+        pipeline_cache=args.pipeline_cache,
+        max_latency_ms=args.max_latency_ms,
+        max_size_mb=args.max_size_mb,
+        partition_filter=partition_filter,
     )
     return 0
 
@@ -6,19 +6,41 @@ from pathlib import Path
 import pandas as pd
 import streamlit as st
 
+from training.streaming import partition_values, read_table
+
 DATA_PATH = Path(os.getenv("STREAMLIT_DATA_PATH", "data/processed"))
 DEFAULT_FILE = os.getenv("STREAMLIT_DEFAULT_FILE", "")
 SAMPLE_ROWS = int(os.getenv("STREAMLIT_SAMPLE_ROWS", "2000"))
 
 
 def _list_data_files(root: Path) -> list[Path]:
+    # A hive-partitioned dataset (processed_data/year=2024/month=1/...) is listed once,
+    # as its directory, instead of as one entry per part file.
     if not root.exists():
         return []
-    files = [p for p in root.rglob("*") if p.is_file() and p.suffix.lower() in {".parquet", ".csv"}]
-    return sorted(files)
-
-
-def _read_data(path: Path) -> pd.DataFrame:
+    entries = set()
+    for path in root.rglob("*"):
+        if not path.is_file() or path.suffix.lower() not in {".parquet", ".csv"}:
+            continue
+        parts = path.relative_to(root).parts
+        partitioned = [idx for idx, part in enumerate(parts[:-1]) if "=" in part]
+        entries.add(root.joinpath(*parts[: partitioned[0]]) if partitioned else path)
+    return sorted(entries)
+
+
+def _list_partitions(path: Path) -> list[str]:
+    return sorted({child.parent.relative_to(path).as_posix() for child in path.rglob("*.parquet")})
+
+
+def _read_data(path: Path, partition: str | None = None) -> pd.DataFrame:
+    if path.is_dir():
+        # Only the chosen partition directory is opened; the rest are pruned.
+        partition_filter = (
+            {key: [value] for key, value in partition_values(Path(partition)).items()}
+            if partition
+            else None
+        )
+        return read_table(path, partition_filter=partition_filter)
     if path.suffix.lower() == ".parquet":
         return pd.read_parquet(path)
     return pd.read_csv(path)
@@ -50,16 +72,26 @@ with left:
         "Choose a file",
         files,
         index=default_index,
-        format_func=lambda p: p.name,
+        format_func=lambda p: f"{p.name}/" if p.is_dir() else p.name,
     )
 
+    partition = None
+    if chosen.is_dir():
+        partitions = _list_partitions(chosen)
+        partition = st.selectbox(
+            "Partition",
+            [None, *partitions],
+            index=0,
+            format_func=lambda p: p or "All partitions",
+        )
+
     st.write("Preview options")
     sample = st.checkbox("Sample rows", value=True)
     nrows = st.slider("Rows to display", min_value=50, max_value=5000, value=500)
 
 with right:
     st.subheader("Preview")
-    data = _read_data(chosen)
+    data = _read_data(chosen, partition)
 
     if sample and len(data) > SAMPLE_ROWS:
         data = data.sample(SAMPLE_ROWS, random_state=42)
@@ -1,3 +1,6 @@
+import asyncio
+import os
+import threading
 from pathlib import Path
 
 import pytest
@@ -23,12 +26,13 @@ def test_health(api_deps) -> None:
     assert response.json() == {"status": "ok"}
 
 
-def test_predict(tmp_path: Path, monkeypatch, api_deps) -> None:
-    app, joblib, TestClient, LinearRegression = api_deps
-    model_path = tmp_path / "model.joblib"
+def _write_model(
+    tmp_path: Path, joblib, LinearRegression, scale: float = 1.0, name: str = "model"
+) -> Path:
+    model_path = tmp_path / f"{name}.joblib"
     features = ["trip_distance", "passenger_count"]
     X = [[1.0, 1.0], [2.0, 2.0], [3.0, 4.0]]
-    y = [2.0, 4.0, 7.0]
+    y = [2.0 * scale, 4.0 * scale, 7.0 * scale]
     model = LinearRegression(fit_intercept=False)
     model.fit(X, y)
     joblib.dump(
@@ -41,6 +45,12 @@ def test_predict(tmp_path: Path, monkeypatch, api_deps) -> None:
         },
         model_path,
     )
+    return model_path
+
+
+def test_predict(tmp_path: Path, monkeypatch, api_deps) -> None:
+    app, joblib, TestClient, LinearRegression = api_deps
+    model_path = _write_model(tmp_path, joblib, LinearRegression)
 
     monkeypatch.setenv("MODEL_PATH", str(model_path))
     client = TestClient(app)
@@ -50,3 +60,373 @@ def test_predict(tmp_path: Path, monkeypatch, api_deps) -> None:
     )
     assert response.status_code == 200
     assert response.json()["prediction"] == pytest.approx(5.0)
+
+
+def test_predict_batch_rows_reports_row_errors(tmp_path: Path, monkeypatch, api_deps) -> None:
+    app, joblib, TestClient, LinearRegression = api_deps
+    model_path = _write_model(tmp_path, joblib, LinearRegression)
+
+    monkeypatch.setenv("MODEL_PATH", str(model_path))
+    client = TestClient(app)
+    response = client.post(
+        "/predict/batch",
+        json={
+            "rows": [
+                {"trip_distance": 2.0, "passenger_count": 3.0},
+                {"trip_distance": 1.0},
+                {"trip_distance": "abc", "passenger_count": 1.0},
+                {"trip_distance": 1.0, "passenger_count": 1.0},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["predictions"][0] == pytest.approx(5.0)
+    assert body["predictions"][1] is None
+    assert body["predictions"][2] is None
+    assert body["predictions"][3] == pytest.approx(2.0)
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+    assert "passenger_count" in body["errors"][0]["detail"]
+    assert "trip_distance" in body["errors"][1]["detail"]
+
+
+def test_predict_batch_columns(tmp_path: Path, monkeypatch, api_deps) -> None:
+    app, joblib, TestClient, LinearRegression = api_deps
+    model_path = _write_model(tmp_path, joblib, LinearRegression)
+
+    monkeypatch.setenv("MODEL_PATH", str(model_path))
+    client = TestClient(app)
+    response = client.post(
+        "/predict/batch",
+        json={"columns": {"trip_distance": [2.0, 1.0, 3.0], "passenger_count": [3.0, None, 4.0]}},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["predictions"][0] == pytest.approx(5.0)
+    assert body["predictions"][1] is None
+    assert body["predictions"][2] == pytest.approx(7.0)
+    assert body["errors"] == [
+        {"index": 1, "detail": "Invalid values for features: passenger_count"}
+    ]
+
+    response = client.post(
+        "/predict/batch",
+        json={"columns": {"trip_distance": [2.0, 1.0], "passenger_count": [3.0]}},
+    )
+    assert response.status_code == 400
+
+    response = client.post("/predict/batch", json={})
+    assert response.status_code == 422
+
+    # Unused columns do not count towards the batch size limit.
+    monkeypatch.setenv("MAX_BATCH_ROWS", "10")
+    response = client.post(
+        "/predict/batch",
+        json={
+            "columns": {
+                "trip_distance": [2.0, 1.0],
+                "passenger_count": [3.0, 1.0],
+                "notes": ["x"] * 20,
+            }
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["predictions"] == pytest.approx([5.0, 2.0])
+    response = client.post(
+        "/predict/batch",
+        json={"columns": {"trip_distance": [1.0] * 11, "passenger_count": [1.0] * 11}},
+    )
+    assert response.status_code == 413
+
+
+def test_lifespan_preloads_model(tmp_path: Path, monkeypatch, api_deps) -> None:
+    app, joblib, TestClient, LinearRegression = api_deps
+    from api.main import model_store
+
+    model_path = _write_model(tmp_path, joblib, LinearRegression)
+    monkeypatch.setenv("MODEL_PATH", str(model_path))
+    monkeypatch.setenv("MODEL_RELOAD_INTERVAL", "0")
+    with TestClient(app) as client:
+        assert model_store.current is not None
+        assert model_store.current.path == model_path
+        response = client.post(
+            "/predict",
+            json={"features": {"trip_distance": 2.0, "passenger_count": 3.0}},
+        )
+    assert response.json()["prediction"] == pytest.approx(5.0)
+
+
+def test_model_store_hot_swaps_changed_file(tmp_path: Path, api_deps) -> None:
+    from api.model_store import ModelStore
+
+    _, joblib, _, LinearRegression = api_deps
+    model_path = _write_model(tmp_path, joblib, LinearRegression)
+    store = ModelStore(use_hash=True)
+    swapped = []
+    store.add_listener(swapped.append)
+
+    first = store.get(model_path)
+    assert store.reload_if_changed(model_path) is False
+
+    stat = model_path.stat()
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert store.reload_if_changed(model_path) is False
+
+    _write_model(tmp_path, joblib, LinearRegression, scale=2.0)
+    stat = model_path.stat()
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert store.reload_if_changed(model_path) is True
+
+    second = store.get(model_path)
+    assert second is not first
+    assert swapped == [second]
+    row = {"trip_distance": 2.0, "passenger_count": 3.0}
+    assert second.predictor.predict_one(row) == pytest.approx(2 * first.predictor.predict_one(row))
+
+
+@pytest.mark.parametrize("executor_kind", [None, "thread", "process"])
+def test_micro_batcher_coalesces_rows(tmp_path: Path, api_deps, executor_kind: str | None) -> None:
+    from api.batching import MicroBatcher
+    from api.executor import PredictionExecutor
+    from api.model_store import ModelStore
+
+    _, joblib, _, LinearRegression = api_deps
+    model = ModelStore().get(_write_model(tmp_path, joblib, LinearRegression))
+    executor = PredictionExecutor(kind=executor_kind or "thread", workers=1)
+    submitted = []
+
+    def submit(model, X):
+        submitted.append(len(X))
+        return executor.submit(model, X)
+
+    batcher = MicroBatcher(
+        max_batch_size=4, max_wait_ms=200, submit=submit if executor_kind else None
+    )
+    rows = [
+        model.predictor.row_vector({"trip_distance": float(i), "passenger_count": 1.0})
+        for i in range(4)
+    ]
+    try:
+        futures = [batcher.submit(model, row) for row in rows]
+        results = [future.result(timeout=30) for future in futures]
+    finally:
+        batcher.stop()
+        executor.shutdown()
+
+    assert results == pytest.approx([1.0, 2.0, 3.0, 4.0])
+    # With an executor the coalesced batch is scored on its pool, not the batcher thread.
+    assert submitted == ([4] if executor_kind else [])
+    stats = batcher.metrics()
+    assert stats["batches"] == 1
+    assert stats["rows"] == 4
+    assert stats["max_batch_size"] == 4
+
+
+def test_predict_with_batching_enabled(tmp_path: Path, monkeypatch, api_deps) -> None:
+    app, joblib, TestClient, LinearRegression = api_deps
+    model_path = _write_model(tmp_path, joblib, LinearRegression)
+    monkeypatch.setenv("MODEL_PATH", str(model_path))
+    monkeypatch.setenv("MODEL_RELOAD_INTERVAL", "0")
+    monkeypatch.setenv("PREDICT_BATCHING", "1")
+    with TestClient(app) as client:
+        response = client.post(
+            "/predict",
+            json={"features": {"trip_distance": 2.0, "passenger_count": 3.0}},
+        )
+        stats = client.get("/metrics").json()["batching"]
+    assert response.json()["prediction"] == pytest.approx(5.0)
+    assert stats["rows"] >= 1
+
+
+def test_prediction_executor_rejects_when_saturated(tmp_path: Path, api_deps) -> None:
+    from api.executor import ExecutorSaturatedError, PredictionExecutor
+    from api.model_store import ModelStore
+
+    _, joblib, _, LinearRegression = api_deps
+    model = ModelStore().get(_write_model(tmp_path, joblib, LinearRegression))
+    executor = PredictionExecutor(kind="thread", workers=1, max_pending=1)
+    release = threading.Event()
+    original = model.predictor.predict_one
+
+    def slow_predict(values):
+        release.wait(timeout=5)
+        return original(values)
+
+    model.predictor.predict_one = slow_predict
+    row = {"trip_distance": 2.0, "passenger_count": 3.0}
+
+    async def scenario():
+        first = asyncio.create_task(executor.predict_one(model, row))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.predict_one(model, row)
+        release.set()
+        return await first
+
+    try:
+        assert asyncio.run(scenario()) == pytest.approx(5.0)
+    finally:
+        executor.shutdown()
+    assert executor.metrics()["rejected"] == 1
+
+
+def test_predict_in_worker_reloads_on_signature_change(tmp_path: Path, api_deps) -> None:
+    import numpy as np
+
+    from api.executor import predict_in_worker
+
+    _, joblib, _, LinearRegression = api_deps
+    model_path = _write_model(tmp_path, joblib, LinearRegression)
+    X = np.array([[2.0, 3.0]])
+    assert predict_in_worker(str(model_path), "v1", X)[0] == pytest.approx(5.0)
+
+    _write_model(tmp_path, joblib, LinearRegression, scale=2.0)
+    assert predict_in_worker(str(model_path), "v1", X)[0] == pytest.approx(5.0)
+    assert predict_in_worker(str(model_path), "v2", X)[0] == pytest.approx(10.0)
+
+
+@pytest.mark.parametrize("mmap_mode", [None, "r"])
+def test_process_executor_predicts(tmp_path: Path, api_deps, mmap_mode) -> None:
+    from api.executor import PredictionExecutor
+    from api.model_store import ModelStore
+
+    _, joblib, _, LinearRegression = api_deps
+    model = ModelStore().get(_write_model(tmp_path, joblib, LinearRegression))
+    executor = PredictionExecutor(kind="process", workers=1, mmap_mode=mmap_mode)
+    row = {"trip_distance": 2.0, "passenger_count": 3.0}
+
+    async def scenario():
+        single = await executor.predict_one(model, row)
+        batch = await executor.predict(model, model.predictor.row_vector(row)[None, :].repeat(3, 0))
+        return single, batch
+
+    try:
+        single, batch = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert single == pytest.approx(5.0)
+    assert list(batch) == pytest.approx([5.0, 5.0, 5.0])
+    assert executor.metrics()["completed"] == 2
+
+
+def test_model_registry_evicts_by_resident_bytes(tmp_path: Path, api_deps) -> None:
+    from api.registry import ModelRegistry, _bundle_nbytes
+
+    _, joblib, _, LinearRegression = api_deps
+    for name in ("yellow", "green", "fhv"):
+        _write_model(tmp_path, joblib, LinearRegression, name=name)
+    # The budget counts the arrays of the loaded bundle, not the file on disk.
+    bundle = joblib.load(tmp_path / "yellow.joblib")
+    model_size = _bundle_nbytes(bundle)
+    assert model_size >= bundle["model"].coef_.nbytes > 0
+    registry = ModelRegistry(tmp_path, max_bytes=2 * model_size)
+
+    assert registry.available() == ["fhv", "green", "yellow"]
+    yellow = registry.get("yellow")
+    registry.get("green")
+    assert registry.get("yellow") is yellow
+    registry.get("fhv")
+
+    assert registry.loaded() == ["yellow", "fhv"]
+    stats = registry.metrics()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+    assert stats["resident_bytes"] == 2 * model_size
+
+    with pytest.raises(ValueError):
+        registry.resolve("../secret")
+    with pytest.raises(FileNotFoundError):
+        registry.get("missing")
+
+
+def test_predict_named_model(tmp_path: Path, monkeypatch, api_deps) -> None:
+    import api.main as api_main
+    from api.registry import ModelRegistry
+
+    app, joblib, TestClient, LinearRegression = api_deps
+    _write_model(tmp_path, joblib, LinearRegression, scale=2.0, name="green")
+    monkeypatch.setattr(api_main, "model_registry", ModelRegistry(tmp_path, max_bytes=1 << 30))
+
+    client = TestClient(app)
+    row = {"trip_distance": 2.0, "passenger_count": 3.0}
+    response = client.post("/models/green/predict", json={"features": row})
+    assert response.status_code == 200
+    assert response.json()["prediction"] == pytest.approx(10.0)
+
+    response = client.post("/models/green/predict/batch", json={"rows": [row, row]})
+    assert response.json()["predictions"] == pytest.approx([10.0, 10.0])
+
+    assert client.post("/models/yellow/predict", json={"features": row}).status_code == 404
+    assert client.get("/models").json() == {"available": ["green"], "loaded": ["green"]}
+    assert client.get("/metrics").json()["registry"]["hits"] == 1
+
+
+def test_load_model_memory_mapped(tmp_path: Path, api_deps) -> None:
+    from api.model_store import load_model
+
+    _, joblib, _, LinearRegression = api_deps
+    model_path = _write_model(tmp_path, joblib, LinearRegression)
+    in_memory = load_model(model_path)
+    mapped = load_model(model_path, mmap_mode="r")
+    row = {"trip_distance": 2.0, "passenger_count": 3.0}
+    assert mapped.predictor.predict_one(row) == pytest.approx(in_memory.predictor.predict_one(row))
+
+
+def test_prediction_cache_quantizes_and_expires(tmp_path: Path, monkeypatch, api_deps) -> None:
+    import numpy as np
+
+    from api import cache as cache_module
+    from api.cache import PredictionCache, parse_quantize
+    from api.model_store import ModelStore
+
+    _, joblib, _, LinearRegression = api_deps
+    model = ModelStore().get(_write_model(tmp_path, joblib, LinearRegression))
+    cache = PredictionCache(
+        max_entries=2, ttl_seconds=10, quantize=parse_quantize("trip_distance=0.5")
+    )
+
+    first = cache.quantize(model.features, np.array([2.1, 3.0]))
+    second = cache.quantize(model.features, np.array([1.9, 3.0]))
+    assert first.tolist() == [2.0, 3.0]
+    assert cache.key(model, first) == cache.key(model, second)
+
+    cache.put(cache.key(model, first), 5.0)
+    assert cache.get(cache.key(model, second)) == 5.0
+    cache.put(cache.key(model, np.array([1.0, 1.0])), 2.0)
+    cache.put(cache.key(model, np.array([3.0, 4.0])), 7.0)
+    assert cache.get(cache.key(model, first)) is None
+
+    now = cache_module.time.monotonic()
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now + 60)
+    assert cache.get(cache.key(model, np.array([3.0, 4.0]))) is None
+
+    stats = cache.metrics()
+    assert stats["hits"] == 1
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+
+
+def test_predict_uses_cache_and_flushes_on_swap(tmp_path: Path, monkeypatch, api_deps) -> None:
+    import api.main as api_main
+    from api.cache import PredictionCache
+
+    app, joblib, TestClient, LinearRegression = api_deps
+    model_path = _write_model(tmp_path, joblib, LinearRegression)
+    cache = PredictionCache(max_entries=16)
+    monkeypatch.setattr(api_main, "prediction_cache", cache)
+    monkeypatch.setenv("MODEL_PATH", str(model_path))
+    monkeypatch.setattr(api_main.model_store, "_listeners", [cache.clear])
+
+    client = TestClient(app)
+    payload = {"features": {"trip_distance": 2.0, "passenger_count": 3.0}}
+    assert client.post("/predict", json=payload).json()["prediction"] == pytest.approx(5.0)
+    assert client.post("/predict", json=payload).json()["prediction"] == pytest.approx(5.0)
+    assert cache.metrics()["hits"] == 1
+
+    _write_model(tmp_path, joblib, LinearRegression, scale=2.0)
+    stat = model_path.stat()
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert api_main.model_store.reload_if_changed(model_path) is True
+    assert cache.metrics()["size"] == 0
+    assert client.post("/predict", json=payload).json()["prediction"] == pytest.approx(10.0)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import warnings
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def inference_deps():
+    pytest.require_optional("numpy", "pandas", "sklearn")
+    import pandas as pd
+    from sklearn.linear_model import ElasticNet
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    from api.inference import CompiledPredictor, compile_bundle
+
+    return pd, ElasticNet, Pipeline, StandardScaler, CompiledPredictor, compile_bundle
+
+
+def _fit_pipeline(pd, ElasticNet, Pipeline, StandardScaler):
+    X = pd.DataFrame(
+        {
+            "trip_distance": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "passenger_count": [1.0, 2.0, 1.0, 3.0, 2.0],
+        }
+    )
+    y = [300.0, 600.0, 800.0, 1200.0, 1400.0]
+    pipeline = Pipeline([("scaler", StandardScaler()), ("model", ElasticNet(alpha=0.1))])
+    pipeline.fit(X, y)
+    return pipeline, X
+
+
+def test_compiled_predictor_matches_pandas_path(inference_deps) -> None:
+    pd, ElasticNet, Pipeline, StandardScaler, CompiledPredictor, _ = inference_deps
+    pipeline, X = _fit_pipeline(pd, ElasticNet, Pipeline, StandardScaler)
+
+    row = {"passenger_count": 2.0, "trip_distance": 2.5, "extra": 1.0}
+    expected = float(pipeline.predict(pd.DataFrame([{k: row[k] for k in X.columns}]))[0])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        predictor = CompiledPredictor(pipeline, list(X.columns))
+        assert predictor.predict_one(row) == pytest.approx(expected)
+        assert predictor.predict_many(X.to_numpy()) == pytest.approx(pipeline.predict(X))
+
+
+def test_compiled_predictor_leaves_global_warning_filters(inference_deps) -> None:
+    pd, ElasticNet, Pipeline, StandardScaler, CompiledPredictor, _ = inference_deps
+    pipeline, X = _fit_pipeline(pd, ElasticNet, Pipeline, StandardScaler)
+
+    filters = list(warnings.filters)
+    predictor = CompiledPredictor(pipeline, list(X.columns))
+    predictor.predict_many(X.to_numpy())
+    assert warnings.filters == filters
+
+
+def test_compile_bundle_rejects_feature_mismatch(inference_deps) -> None:
+    pd, ElasticNet, Pipeline, StandardScaler, _, compile_bundle = inference_deps
+    pipeline, _ = _fit_pipeline(pd, ElasticNet, Pipeline, StandardScaler)
+
+    with pytest.raises(ValueError, match="do not match"):
+        compile_bundle({"model": pipeline, "features": ["passenger_count", "trip_distance"]})
+    with pytest.raises(ValueError, match="missing feature list"):
+        compile_bundle({"model": pipeline, "features": []})
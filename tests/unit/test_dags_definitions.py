@@ -81,6 +81,7 @@ def test_trained_model_and_evaluation_report(monkeypatch, tmp_path: Path) -> Non
     _set_env_defaults(monkeypatch, raw_dir, processed_dir, model_path)
 
     monkeypatch.setattr(defs, "REPORTS_DIR", tmp_path / "reports")
+    monkeypatch.delenv("PREDICTIONS_CACHE_DIR", raising=False)
 
     def fake_train_model(data_path, model_out, metrics_out):
         model_out.parent.mkdir(parents=True, exist_ok=True)
@@ -88,9 +89,12 @@ def test_trained_model_and_evaluation_report(monkeypatch, tmp_path: Path) -> Non
         metrics_out.parent.mkdir(parents=True, exist_ok=True)
         metrics_out.write_text("{}")
 
-    def fake_evaluate_model(data_path, model_path):
+    caches = []
+
+    def fake_evaluate_model(data_path, model_path, predictions_cache=None):
         _ = data_path
         _ = model_path
+        caches.append(predictions_cache)
         return {"rmse": 1.23}
 
     monkeypatch.setattr(defs, "train_model", fake_train_model)
@@ -106,3 +110,8 @@ def test_trained_model_and_evaluation_report(monkeypatch, tmp_path: Path) -> Non
     evaluation_path = Path(trained.evaluation_path)
     assert evaluation_path.exists()
     assert json.loads(evaluation_path.read_text()) == {"rmse": 1.23}
+
+    # The predictions cache is opt-in.
+    monkeypatch.setenv("PREDICTIONS_CACHE_DIR", str(tmp_path / "cache"))
+    defs.evaluation_report(prepared, trained)
+    assert caches == [None, tmp_path / "cache"]
@@ -58,3 +58,313 @@ def test_evaluate_writes_metrics(tmp_path: Path, monkeypatch, eval_deps) -> None
 
     assert exit_code == 0
     assert output_path.exists()
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_chunked_evaluation_matches_in_memory(tmp_path: Path, eval_deps, suffix: str) -> None:
+    pytest.require_optional("pyarrow")
+    import numpy as np
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    from training.evaluate import evaluate_model
+
+    joblib, _, _ = eval_deps
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "trip_distance": rng.uniform(0.5, 15.0, 1000),
+            "passenger_count": rng.integers(1, 5, 1000),
+        }
+    )
+    df["trip_duration"] = 120 + df["trip_distance"] * 180 + rng.normal(0, 60, 1000)
+    data_path = tmp_path / f"data{suffix}"
+    if suffix == ".csv":
+        df.to_csv(data_path, index=False)
+    else:
+        df.to_parquet(data_path, index=False, row_group_size=300)
+
+    features = ["trip_distance", "passenger_count"]
+    model = LinearRegression().fit(df[features].iloc[:100], df["trip_duration"].iloc[:100])
+    model_path = tmp_path / "model.joblib"
+    joblib.dump({"model": model, "features": features, "target": "trip_duration"}, model_path)
+
+    full = evaluate_model(data_path, model_path)["metrics"]
+    chunked = evaluate_model(data_path, model_path, batch_size=128)["metrics"]
+
+    assert chunked["samples"] == full["samples"] == 1000
+    assert chunked["batches"] > 1
+    for key in ("mae", "rmse", "r2"):
+        assert chunked[key] == pytest.approx(full[key], rel=1e-12)
+
+
+def test_slice_metrics_match_groupby(tmp_path: Path, monkeypatch, eval_deps) -> None:
+    pytest.require_optional("pyarrow")
+    import json
+
+    import numpy as np
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    from training.evaluate import slice_metrics
+
+    joblib, _, main = eval_deps
+    rng = np.random.default_rng(1)
+    rows = 600
+    df = pd.DataFrame(
+        {
+            "trip_distance": rng.uniform(0.1, 25.0, rows),
+            "pickup_hour": rng.integers(0, 24, rows),
+            "pickup_weekday": rng.integers(0, 7, rows),
+            "PULocationID": rng.choice([132, 138, 161], rows),
+        }
+    )
+    df["is_airport_pickup"] = df["PULocationID"].isin([132, 138]).astype(int)
+    df["trip_duration"] = 120 + df["trip_distance"] * 150 + rng.normal(0, 60, rows)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    df.iloc[:250].to_parquet(data_dir / "part-0.parquet", index=False)
+    df.iloc[250:].to_parquet(data_dir / "part-1.parquet", index=False)
+
+    features = ["trip_distance", "pickup_hour"]
+    model = LinearRegression().fit(df[features], df["trip_duration"])
+    model_path = tmp_path / "model.joblib"
+    joblib.dump({"model": model, "features": features, "target": "trip_duration"}, model_path)
+
+    serial = slice_metrics(data_dir, model_path)
+    parallel = slice_metrics(data_dir, model_path, workers=2, batch_size=100)
+    pd.testing.assert_frame_equal(serial, parallel, rtol=1e-9)
+
+    assert set(serial["slice"]) == {
+        "pickup_hour",
+        "pickup_weekday",
+        "PULocationID",
+        "is_airport_pickup",
+        "distance_bucket",
+    }
+    errors = (df["trip_duration"] - model.predict(df[features])).abs()
+    expected = errors.groupby(df["pickup_weekday"]).mean()
+    weekday = serial[serial["slice"] == "pickup_weekday"].set_index("value")["mae"]
+    for value, mae in expected.items():
+        assert weekday[str(value)] == pytest.approx(mae)
+    airport = serial[serial["slice"] == "is_airport_pickup"]
+    assert airport["samples"].sum() == rows
+
+    data_path = tmp_path / "data.csv"
+    df.to_csv(data_path, index=False)
+    output_path = tmp_path / "evaluation.json"
+    monkeypatch.chdir(tmp_path)
+    exit_code = main(
+        [
+            "--data",
+            str(data_path),
+            "--model",
+            str(model_path),
+            "--output",
+            str(output_path),
+            "--slices",
+        ]
+    )
+    assert exit_code == 0
+    records = json.loads((tmp_path / "evaluation_slices.json").read_text())
+    assert {"slice", "value", "samples", "mae", "rmse", "r2"} <= set(records[0])
+
+
+def test_slice_values_ignore_int_float_storage(tmp_path: Path, eval_deps) -> None:
+    pytest.require_optional("pyarrow")
+    import numpy as np
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    from training.evaluate import slice_metrics
+
+    joblib, _, _ = eval_deps
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame(
+        {
+            "trip_distance": rng.uniform(0.5, 15.0, 400),
+            "pickup_hour": rng.integers(0, 3, 400),
+            "PULocationID": rng.choice([132, 138], 400),
+        }
+    )
+    df["trip_duration"] = 120 + df["trip_distance"] * 180 + rng.normal(0, 60, 400)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    df.iloc[:200].to_parquet(data_dir / "part-0.parquet", index=False)
+    # The same codes stored as floats, as they are after a NULL forced a float column.
+    df.iloc[200:].astype({"pickup_hour": "float64", "PULocationID": "float64"}).to_parquet(
+        data_dir / "part-1.parquet", index=False
+    )
+
+    features = ["trip_distance"]
+    model = LinearRegression().fit(df[features], df["trip_duration"])
+    model_path = tmp_path / "model.joblib"
+    joblib.dump({"model": model, "features": features, "target": "trip_duration"}, model_path)
+
+    report = slice_metrics(data_dir, model_path).set_index(["slice", "value"])["samples"]
+    for column in ("pickup_hour", "PULocationID"):
+        expected = df[column].value_counts()
+        assert report[column].to_dict() == {str(key): count for key, count in expected.items()}
+
+
+def test_slice_metrics_skip_files_emptied_by_filter(tmp_path: Path, eval_deps) -> None:
+    pytest.require_optional("pyarrow")
+    import numpy as np
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    from training.evaluate import slice_metrics
+
+    joblib, _, _ = eval_deps
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame(
+        {"trip_distance": rng.uniform(0.5, 15.0, 300), "pickup_hour": np.repeat([0, 1, 2], 100)}
+    )
+    df["trip_duration"] = 120 + df["trip_distance"] * 180 + rng.normal(0, 60, 300)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    df.iloc[:200].to_parquet(data_dir / "part-0.parquet", index=False)
+    df.iloc[200:].to_parquet(data_dir / "part-1.parquet", index=False)
+
+    features = ["trip_distance"]
+    model = LinearRegression().fit(df[features], df["trip_duration"])
+    model_path = tmp_path / "model.joblib"
+    joblib.dump({"model": model, "features": features, "target": "trip_duration"}, model_path)
+
+    # part-0 holds hours 0 and 1 only, so the filter leaves nothing of it.
+    for batch_size in (None, 50):
+        report = slice_metrics(
+            data_dir, model_path, batch_size=batch_size, partition_filter={"pickup_hour": ["2"]}
+        )
+        hours = report[report["slice"] == "pickup_hour"]
+        assert hours["value"].tolist() == ["2"]
+        assert hours["samples"].tolist() == [100]
+    with pytest.raises(ValueError, match="No rows to evaluate"):
+        slice_metrics(data_dir, model_path, partition_filter={"pickup_hour": ["9"]})
+
+
+def test_evaluation_reuses_cached_predictions(tmp_path: Path, eval_deps) -> None:
+    pytest.require_optional("pyarrow")
+    import numpy as np
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    from training.evaluate import evaluate_model, slice_metrics
+
+    joblib, _, _ = eval_deps
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(
+        {"trip_distance": rng.uniform(0.5, 15.0, 500), "pickup_hour": rng.integers(0, 24, 500)}
+    )
+    df["trip_duration"] = 120 + df["trip_distance"] * 180 + rng.normal(0, 60, 500)
+    data_path = tmp_path / "data.parquet"
+    df.to_parquet(data_path, index=False, row_group_size=200)
+
+    features = ["trip_distance", "pickup_hour"]
+    model = LinearRegression().fit(df[features], df["trip_duration"])
+    model_path = tmp_path / "model.joblib"
+    joblib.dump({"model": model, "features": features, "target": "trip_duration"}, model_path)
+    cache_dir = tmp_path / "predictions"
+
+    first = evaluate_model(data_path, model_path, predictions_cache=cache_dir)
+    assert first["predictions_cache"] == {"dir": str(cache_dir), "hits": 0, "misses": 1}
+    cached = list(cache_dir.glob("*.parquet"))
+    assert len(cached) == 1
+    assert pd.read_parquet(cached[0])["prediction"].to_numpy() == pytest.approx(
+        model.predict(df[features])
+    )
+
+    again = evaluate_model(data_path, model_path, batch_size=64, predictions_cache=cache_dir)
+    assert again["predictions_cache"]["hits"] == 1
+    for key in ("mae", "rmse", "r2"):
+        assert again["metrics"][key] == pytest.approx(first["metrics"][key], rel=1e-12)
+    pd.testing.assert_frame_equal(
+        slice_metrics(data_path, model_path, predictions_cache=cache_dir),
+        slice_metrics(data_path, model_path),
+    )
+
+    # A retrained bundle has a different content hash and gets its own entry.
+    model.intercept_ += 1.0
+    joblib.dump({"model": model, "features": features, "target": "trip_duration"}, model_path)
+    retrained = evaluate_model(data_path, model_path, predictions_cache=cache_dir)
+    assert retrained["predictions_cache"]["misses"] == 1
+    assert len(list(cache_dir.glob("*.parquet"))) == 2
+
+
+def test_partition_filter_prunes_dataset(tmp_path: Path, monkeypatch, eval_deps) -> None:
+    pytest.require_optional("pyarrow")
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from sklearn.linear_model import LinearRegression
+
+    import training.predictions as predictions
+    from training.evaluate import evaluate_model, slice_metrics
+
+    joblib, _, _ = eval_deps
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "trip_distance": rng.uniform(0.5, 15.0, 600),
+            "pickup_hour": rng.integers(0, 24, 600),
+            "month": rng.integers(1, 4, 600),
+        }
+    )
+    df["trip_duration"] = 120 + df["trip_distance"] * 180 + rng.normal(0, 60, 600)
+    dataset = tmp_path / "processed_data"
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        dataset,
+        format="parquet",
+        partitioning=["month"],
+        partitioning_flavor="hive",
+    )
+
+    features = ["trip_distance", "pickup_hour"]
+    model = LinearRegression().fit(df[features], df["trip_duration"])
+    model_path = tmp_path / "model.joblib"
+    joblib.dump({"model": model, "features": features, "target": "trip_duration"}, model_path)
+
+    selected = df[df["month"].isin([1, 3]) & (df["pickup_hour"] < 12)].drop(columns="month")
+    flat_path = tmp_path / "selected.parquet"
+    selected.to_parquet(flat_path, index=False)
+    hours = [str(hour) for hour in range(12)]
+    partition_filter = {"month": ["1", "3"], "pickup_hour": hours}
+    expected = evaluate_model(flat_path, model_path)["metrics"]
+    cache_dir = tmp_path / "predictions"
+    hashed: list[Path] = []
+    content_hash = predictions.content_hash
+    monkeypatch.setattr(
+        predictions, "content_hash", lambda path: hashed.append(path) or content_hash(path)
+    )
+    for batch_size in (None, 50):
+        pruned = evaluate_model(
+            dataset,
+            model_path,
+            batch_size=batch_size,
+            predictions_cache=cache_dir,
+            partition_filter=partition_filter,
+        )
+        assert pruned["metrics"]["samples"] == len(selected)
+        for key in ("mae", "rmse", "r2"):
+            assert pruned["metrics"][key] == pytest.approx(expected[key], rel=1e-9)
+    assert pruned["predictions_cache"]["hits"] == 2
+    # The model is hashed once per evaluation, not once per data file.
+    assert hashed.count(model_path) == 2
+    slice_metrics(
+        dataset, model_path, predictions_cache=cache_dir, partition_filter=partition_filter
+    )
+    assert hashed.count(model_path) == 3
+
+    for batch_size in (None, 50):
+        with pytest.raises(ValueError, match="No rows to evaluate"):
+            evaluate_model(
+                dataset,
+                model_path,
+                batch_size=batch_size,
+                partition_filter={"month": ["1"], "pickup_hour": ["99"]},
+            )
+
+    report = slice_metrics(dataset, model_path, partition_filter=partition_filter)
+    assert set(report.loc[report["slice"] == "pickup_hour", "value"]) == set(hours)
@@ -44,3 +44,443 @@ def test_process_data_writes_outputs_csv(tmp_path: Path, process_data_main) -> N
     assert (output_dir / "processed_data.csv").exists()
     assert (output_dir / "features.txt").exists()
     assert (output_dir / "data_summary.txt").exists()
+
+
+def _synthetic_trips(rows: int, seed: int):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    pickup = pd.Timestamp("2024-01-01") + pd.to_timedelta(
+        rng.integers(0, 14 * 86400, rows), unit="s"
+    )
+    duration = pd.to_timedelta(rng.integers(-60, 4 * 3600, rows), unit="s")
+    passengers = pd.array(rng.integers(0, 10, rows), dtype="Int64")
+    passengers[rng.random(rows) < 0.05] = pd.NA
+    return pd.DataFrame(
+        {
+            "tpep_pickup_datetime": pickup,
+            "tpep_dropoff_datetime": pickup + duration,
+            "passenger_count": passengers,
+            "trip_distance": rng.choice([0.0, 0.5, 1.25, 3.335, 12.0, 150.0], rows),
+            "fare_amount": rng.uniform(-5, 80, rows),
+            "PULocationID": rng.choice([132, 138, 161, 10, 236], rows).astype("int32"),
+            "DOLocationID": rng.choice([132, 48, 161, 79], rows).astype("int32"),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    ("input_format", "sample_size"),
+    [("parquet", None), ("parquet", 300), ("csv", None), ("csv", 300)],
+)
+def test_duckdb_engine_matches_pandas(
+    tmp_path: Path, process_data_main, input_format: str, sample_size: int | None
+) -> None:
+    pytest.require_optional("duckdb", "pyarrow")
+    import pandas as pd
+
+    from scripts.data_tools.process_data import process_data
+
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    for month in (1, 2):
+        trips = _synthetic_trips(400, seed=month)
+        if month == 2:
+            trips["passenger_count"] = trips["passenger_count"].fillna(1)
+        path = input_dir / f"yellow_tripdata_2024-0{month}.{input_format}"
+        if input_format == "parquet":
+            trips.to_parquet(path, index=False)
+        else:
+            trips.to_csv(path, index=False)
+
+    outputs = {}
+    for engine in ("pandas", "duckdb"):
+        result = process_data(
+            input_dir=input_dir,
+            output_dir=tmp_path / engine,
+            sample_size=sample_size,
+            output_format="parquet",
+            engine=engine,
+        )
+        outputs[engine] = (pd.read_parquet(result["processed_path"]), result["features"])
+
+    expected, expected_features = outputs["pandas"]
+    actual, actual_features = outputs["duckdb"]
+    assert len(expected) > 0
+    assert actual_features == expected_features
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+
+@pytest.mark.parametrize("engine", ["pandas", "duckdb"])
+def test_parquet_scan_projects_and_filters(tmp_path: Path, process_data_main, engine: str) -> None:
+    pytest.require_optional("duckdb", "pyarrow")
+    import numpy as np
+
+    from scripts.data_tools.process_data import RAW_COLUMNS, _load_files, process_data
+
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    trips = _synthetic_trips(20_000, seed=3)
+    rng = np.random.default_rng(3)
+    for idx in range(12):
+        trips[f"unused_{idx}"] = rng.random(len(trips))
+    path = input_dir / "yellow_tripdata_2024-01.parquet"
+    trips.to_parquet(path, index=False, row_group_size=2_000)
+
+    loaded = _load_files([path], "parquet", push_filters=True)
+    assert list(loaded.columns) == RAW_COLUMNS
+    assert loaded["trip_distance"].between(0.01, 100).all()
+    assert len(loaded) < len(trips)
+
+    result = process_data(
+        input_dir=input_dir, output_dir=tmp_path / "out", output_format="csv", engine=engine
+    )
+    scan = result["scan"]
+    assert scan["file_bytes"] == path.stat().st_size
+    if scan["bytes_read"] is not None:
+        assert scan["bytes_read"] < scan["file_bytes"]
+
+
+@pytest.mark.parametrize("sample_size", [None, 500])
+def test_parallel_workers_are_deterministic(
+    tmp_path: Path, process_data_main, sample_size: int | None
+) -> None:
+    pytest.require_optional("duckdb", "pyarrow")
+    import pandas as pd
+
+    from scripts.data_tools.process_data import process_data
+
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    for month in (3, 1, 2):
+        _synthetic_trips(600, seed=month).to_parquet(
+            input_dir / f"yellow_tripdata_2024-0{month}.parquet", index=False
+        )
+
+    outputs = []
+    for engine, workers in [("pandas", 1), ("pandas", 2), ("pandas", 3), ("duckdb", 2)]:
+        result = process_data(
+            input_dir=input_dir,
+            output_dir=tmp_path / f"{engine}-{workers}",
+            sample_size=sample_size,
+            output_format="parquet",
+            engine=engine,
+            workers=workers,
+        )
+        outputs.append(pd.read_parquet(result["processed_path"]))
+        if engine == "pandas" and workers > 1:
+            # Worker processes' reads are invisible to the parent's /proc/self/io.
+            assert result["scan"]["bytes_read"] is None
+
+    assert len(outputs[0]) > 0
+    for output in outputs[1:]:
+        pd.testing.assert_frame_equal(output, outputs[0], check_exact=True)
+    # Parallel parts are scratch files, removed after combining.
+    assert sorted(path.name for path in (tmp_path / "pandas-2").iterdir()) == [
+        "data_summary.txt",
+        "features.txt",
+        "processed_data.parquet",
+    ]
+
+
+def test_incremental_reuses_unchanged_partitions(tmp_path: Path, process_data_main) -> None:
+    pytest.require_optional("duckdb", "pyarrow")
+    import os
+
+    import pandas as pd
+
+    from scripts.data_tools.process_data import process_data
+
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+
+    def write_month(month: int, seed: int) -> Path:
+        path = input_dir / f"yellow_tripdata_2024-0{month}.parquet"
+        _synthetic_trips(500, seed=seed).to_parquet(path, index=False)
+        return path
+
+    def run(**kwargs) -> dict:
+        return process_data(
+            input_dir=input_dir,
+            output_dir=tmp_path / "out",
+            output_format="parquet",
+            incremental=True,
+            **kwargs,
+        )
+
+    write_month(1, seed=1)
+    write_month(2, seed=2)
+    assert run()["incremental"]["processed"] == [
+        "yellow_tripdata_2024-01.parquet",
+        "yellow_tripdata_2024-02.parquet",
+    ]
+    reused = run()
+    assert reused["incremental"]["processed"] == []
+    assert reused["scan"]["bytes_read"] is None
+
+    write_month(3, seed=3)
+    changed = write_month(1, seed=10)
+    stat = changed.stat()
+    os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    result = run(workers=2)
+    assert result["incremental"]["processed"] == [
+        "yellow_tripdata_2024-01.parquet",
+        "yellow_tripdata_2024-03.parquet",
+    ]
+    assert result["incremental"]["reused"] == ["yellow_tripdata_2024-02.parquet"]
+
+    full = process_data(input_dir=input_dir, output_dir=tmp_path / "full", output_format="parquet")
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(result["processed_path"]),
+        pd.read_parquet(full["processed_path"]),
+        check_exact=True,
+    )
+
+    (input_dir / "yellow_tripdata_2024-02.parquet").unlink()
+    result = run()
+    assert result["incremental"]["removed"] == ["yellow_tripdata_2024-02.parquet"]
+    assert not (tmp_path / "out" / "parts" / "yellow_tripdata_2024-02.parquet").exists()
+
+
+def test_incremental_ignores_parts_from_other_modes(tmp_path: Path, process_data_main) -> None:
+    pytest.require_optional("duckdb", "pyarrow")
+    import pandas as pd
+
+    from scripts.data_tools.process_data import process_data
+
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    for month in (1, 2):
+        _synthetic_trips(2_000, seed=month).to_parquet(
+            input_dir / f"yellow_tripdata_2024-0{month}.parquet", index=False
+        )
+    files = ["yellow_tripdata_2024-01.parquet", "yellow_tripdata_2024-02.parquet"]
+    output_dir = tmp_path / "out"
+    full = process_data(input_dir=input_dir, output_dir=tmp_path / "full", output_format="parquet")
+
+    def run(**kwargs) -> dict:
+        return process_data(
+            input_dir=input_dir, output_dir=output_dir, output_format="parquet", **kwargs
+        )
+
+    assert run(incremental=True)["incremental"]["processed"] == files
+    sampled = run(workers=2, sample_size=100)
+    assert sampled["rows"] < full["rows"]
+
+    result = run(incremental=True)
+    assert result["incremental"]["reused"] == files
+    assert result["rows"] == full["rows"]
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(result["processed_path"]), pd.read_parquet(full["processed_path"])
+    )
+
+    # Parts built with other options are rebuilt, not reused.
+    assert run(incremental=True, compact=True)["incremental"]["processed"] == files
+    assert run(incremental=True, compact=True)["incremental"]["processed"] == []
+    assert run(incremental=True, engine="duckdb")["incremental"]["processed"] == files
+
+
+def test_dataset_output_is_hive_partitioned(tmp_path: Path, process_data_main) -> None:
+    pytest.require_optional("pyarrow")
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    from scripts.data_tools.process_data import process_data
+    from training.streaming import read_columns, read_table
+
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    january = _synthetic_trips(400, seed=1)
+    february = _synthetic_trips(400, seed=2)
+    for column in ("tpep_pickup_datetime", "tpep_dropoff_datetime"):
+        february[column] += pd.DateOffset(months=1)
+    january.to_parquet(input_dir / "yellow_tripdata_2024-01.parquet", index=False)
+    february.to_parquet(input_dir / "yellow_tripdata_2024-02.parquet", index=False)
+
+    flat = process_data(input_dir=input_dir, output_dir=tmp_path / "flat", output_format="parquet")
+    result = process_data(
+        input_dir=input_dir,
+        output_dir=tmp_path / "out",
+        output_format="dataset",
+        partition_weekday=True,
+    )
+    dataset = Path(result["processed_path"])
+    assert dataset == tmp_path / "out" / "processed_data"
+    parts = sorted(path.relative_to(dataset).parts[:-1] for path in dataset.rglob("*.parquet"))
+    assert {part[:2] for part in parts} == {("year=2024", "month=1"), ("year=2024", "month=2")}
+    assert all(part[2].startswith("weekday=") for part in parts)
+
+    metadata = pq.ParquetFile(next(dataset.rglob("*.parquet"))).metadata
+    column = metadata.row_group(0).column(0)
+    assert column.compression == "ZSTD"
+    assert column.statistics is not None and column.statistics.has_min_max
+
+    expected = pd.read_parquet(flat["processed_path"])
+    assert read_columns(dataset) == list(expected.columns)
+    assert len(read_table(dataset)) == len(expected)
+
+    weekend = expected["pickup_weekday"].isin([0, 6])
+    january = read_table(dataset, partition_filter={"month": ["1"], "weekday": ["0", "6"]})
+    february = read_table(dataset, partition_filter={"month": ["2"], "weekday": ["0", "6"]})
+    assert list(january.columns) == list(expected.columns)
+    assert january["pickup_weekday"].isin([0, 6]).all()
+    assert len(january) + len(february) == weekend.sum()
+
+    # Filters on data columns are applied per row group using the written statistics.
+    rush = read_table(dataset, partition_filter={"pickup_hour": ["8"]})
+    assert len(rush) == (expected["pickup_hour"] == 8).sum()
+
+
+@pytest.mark.parametrize("input_format", ["parquet", "csv"])
+def test_compact_schema_matches_default(
+    tmp_path: Path, process_data_main, input_format: str
+) -> None:
+    pytest.require_optional("duckdb", "pyarrow")
+    import pandas as pd
+
+    from scripts.data_tools.process_data import COMPACT_DTYPES, process_data
+
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    for month in (1, 2):
+        path = input_dir / f"yellow_tripdata_2024-0{month}.{input_format}"
+        trips = _synthetic_trips(400, seed=month)
+        if input_format == "parquet":
+            trips.to_parquet(path, index=False)
+        else:
+            trips.to_csv(path, index=False)
+
+    def run(name: str, **kwargs) -> tuple[pd.DataFrame, dict]:
+        result = process_data(
+            input_dir=input_dir, output_dir=tmp_path / name, output_format="parquet", **kwargs
+        )
+        return pd.read_parquet(result["processed_path"]), result
+
+    default, _ = run("default")
+    expected = default.astype({col: COMPACT_DTYPES[col] for col in default.columns})
+    for engine in ("pandas", "duckdb"):
+        compact, result = run(f"compact-{engine}", engine=engine, compact=True)
+        assert dict(compact.dtypes) == dict(expected.dtypes)
+        pd.testing.assert_frame_equal(compact, expected, check_exact=True)
+        assert set(result["memory"]) == {"peak_rss_mb", "baseline_rss_mb", "mb_per_million_rows"}
+
+
+@pytest.mark.parametrize("input_format", ["parquet", "csv"])
+def test_sample_is_drawn_at_scan_time(tmp_path: Path, process_data_main, input_format: str) -> None:
+    pytest.require_optional("duckdb", "pyarrow")
+    import numpy as np
+    import pandas as pd
+
+    from scripts.data_tools import process_data as module
+
+    assert module._sample_quotas([100, 300, 0], 10) == [3, 7, 0]
+
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    sizes = {1: 3_000, 2: 1_000}
+    raw = {}
+    for month, rows in sizes.items():
+        raw[month] = _synthetic_trips(rows, seed=month)
+        path = input_dir / f"yellow_tripdata_2024-0{month}.{input_format}"
+        if input_format == "parquet":
+            raw[month].to_parquet(path, index=False, row_group_size=250)
+        else:
+            raw[month].to_csv(path, index=False)
+
+    files = sorted(input_dir.iterdir())
+    if input_format == "csv":
+        # One pass per file: a uniform sample over all files, in file order, the same
+        # whether the files are scanned in this process or in workers.
+        loaded = module._load_csv_sample(files, 40)
+        assert len(loaded) == 40
+        pd.testing.assert_frame_equal(module._load_csv_sample(files, 40, workers=2), loaded)
+        fares = pd.concat([pd.read_csv(path) for path in files])["fare_amount"].to_numpy()
+        positions = [int(np.flatnonzero(fares == fare)[0]) for fare in loaded["fare_amount"]]
+        assert positions == sorted(positions)
+        everything = module._load_csv_sample(files, 10_000)
+        assert (everything["fare_amount"].to_numpy() == fares).all()
+
+        def run(name: str, workers: int) -> pd.DataFrame:
+            result = module.process_data(
+                input_dir=input_dir,
+                output_dir=tmp_path / name,
+                sample_size=40,
+                output_format="parquet",
+                workers=workers,
+            )
+            return pd.read_parquet(result["processed_path"])
+
+        pd.testing.assert_frame_equal(run("parallel", 2), run("serial", 1), check_exact=True)
+        return
+
+    samples = module._sample_positions(files, input_format, 40)
+    assert [len(rows) for rows in samples] == [30, 10]
+    again = module._sample_positions(files, input_format, 40)
+    assert all((first == second).all() for first, second in zip(samples, again, strict=True))
+    loaded = module._load_sample(files, input_format, samples)
+    expected = pd.concat(
+        [raw[month].iloc[rows] for month, rows in zip(sizes, samples)], ignore_index=True
+    )
+    assert len(loaded) == 40
+    assert (loaded["trip_distance"].to_numpy() == expected["trip_distance"].to_numpy()).all()
+
+    result = module.process_data(
+        input_dir=input_dir, output_dir=tmp_path / "out", sample_size=4, output_format="csv"
+    )
+    scan = result["scan"]
+    if scan["bytes_read"] is not None:
+        assert scan["bytes_read"] < scan["file_bytes"] / 2
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_chunked_csv_ingest_matches_in_memory(
+    tmp_path: Path, process_data_main, compact: bool
+) -> None:
+    pytest.require_optional("pyarrow")
+    import numpy as np
+    import pandas as pd
+
+    from scripts.data_tools.process_data import process_data
+    from training.streaming import read_table
+
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    for month in (1, 2):
+        trips = _synthetic_trips(700, seed=month)
+        # Full-precision distances (parsers may differ in the last ulp) and a few NULL zone
+        # IDs, so some 128-row chunks have NULLs and others do not.
+        rng = np.random.default_rng(month)
+        trips["trip_distance"] = rng.uniform(0.01, 30, len(trips))
+        for column in ("PULocationID", "DOLocationID"):
+            trips[column] = trips[column].astype("Int64")
+            trips.loc[rng.choice(300, size=3, replace=False), column] = pd.NA
+        trips.to_csv(input_dir / f"yellow_tripdata_2024-0{month}.csv", index=False)
+
+    def run(name: str, output_format: str, **kwargs) -> dict:
+        return process_data(
+            input_dir=input_dir,
+            output_dir=tmp_path / name,
+            output_format=output_format,
+            compact=compact,
+            **kwargs,
+        )
+
+    for output_format in ("csv", "parquet", "dataset"):
+        full = run(f"full-{output_format}", output_format)
+        streamed = run(f"stream-{output_format}", output_format, chunk_rows=128)
+        assert streamed["stream"] == {"chunk_rows": 128, "chunks": 12}
+        assert streamed["rows"] == full["rows"] > 0
+        assert streamed["features"] == full["features"]
+        if output_format == "csv":
+            expected = Path(full["processed_path"]).read_text()
+            assert Path(streamed["processed_path"]).read_text() == expected
+        else:
+            streamed_df = read_table(Path(streamed["processed_path"]))
+            pd.testing.assert_frame_equal(
+                streamed_df, read_table(Path(full["processed_path"])), check_exact=True
+            )
+            assert str(streamed_df["PULocationID"].dtype) == ("uint16" if compact else "int64")
+
+    with pytest.raises(ValueError, match="Chunked CSV ingest"):
+        run("sampled", "csv", chunk_rows=128, sample_size=10)
@@ -83,3 +83,26 @@ def test_streamlit_helpers(monkeypatch, tmp_path: Path) -> None:
     parquet_df = module._read_data(parquet_path)
     assert len(csv_df) == len(df)
     assert len(parquet_df) == len(df)
+
+
+def test_streamlit_lists_partitioned_dataset(monkeypatch, tmp_path: Path) -> None:
+    df = pd.DataFrame({"trip_distance": [1.2, 3.4, 5.6], "trip_duration": [300, 600, 900]})
+    flat_path = tmp_path / "processed_data.parquet"
+    df.to_parquet(flat_path, index=False)
+    dataset = tmp_path / "processed_data"
+    for month, rows in ((1, df.iloc[:2]), (2, df.iloc[2:])):
+        partition = dataset / "year=2024" / f"month={month}"
+        partition.mkdir(parents=True)
+        rows.to_parquet(partition / "part-0.parquet", index=False)
+
+    monkeypatch.setenv("STREAMLIT_DATA_PATH", str(tmp_path))
+    monkeypatch.setenv("STREAMLIT_DEFAULT_FILE", "processed_data.parquet")
+    monkeypatch.setitem(sys.modules, "streamlit", _install_dummy_streamlit())
+    sys.modules.pop("ui.streamlit_app", None)
+    module = importlib.import_module("ui.streamlit_app")
+
+    assert module._list_data_files(tmp_path) == [dataset, flat_path]
+    assert module._list_partitions(dataset) == ["year=2024/month=1", "year=2024/month=2"]
+    assert list(module._read_data(dataset).columns) == list(df.columns)
+    assert len(module._read_data(dataset)) == 3
+    assert len(module._read_data(dataset, "year=2024/month=2")) == 1
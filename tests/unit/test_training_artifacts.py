@@ -35,3 +35,234 @@ def test_training_writes_baseline_artifacts(tmp_path: Path, monkeypatch, trainin
     assert exit_code == 0
     assert (tmp_path / "models" / "model.joblib").exists()
     assert (tmp_path / ".run" / "reports" / "metrics.json").exists()
+
+    import joblib
+
+    bundle = joblib.load(tmp_path / "models" / "model.joblib")
+    assert bundle["mmap_compatible"] is True
+    assert not (tmp_path / "models" / ".model.joblib.tmp").exists()
+
+
+def test_training_parallel_options_recorded(tmp_path: Path, monkeypatch, training_main) -> None:
+    import json
+
+    from training.train import _allocate_jobs
+
+    assert _allocate_jobs(8, [False, True]) == [1, 7]
+    assert _allocate_jobs(8, [False, True, True]) == [1, 4, 3]
+    assert _allocate_jobs(1, [False, True]) == [1, 1]
+    assert _allocate_jobs(2, [False, True, True]) == [1, 1, 1]
+    assert _allocate_jobs(3, [False, True, True]) == [1, 1, 1]
+    assert _allocate_jobs(4, [False, True, True]) == [1, 2, 1]
+
+    main = training_main
+    data_path = tmp_path / "processed_data.csv"
+    data_path.write_text(
+        "trip_duration,trip_distance,passenger_count\n"
+        "600,2.5,1\n900,5.0,2\n300,1.0,1\n450,1.8,1\n1200,7.5,3\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    exit_code = main(
+        [
+            "--data",
+            str(data_path),
+            "--metrics-out",
+            "metrics.json",
+            "--n-jobs",
+            "2",
+            "--parallel-strategy",
+            "estimator",
+        ]
+    )
+
+    assert exit_code == 0
+    payload = json.loads((tmp_path / "metrics.json").read_text())
+    assert payload["parallelism"] == {"n_jobs": 2, "strategy": "estimator"}
+    assert payload["timing"]["total_seconds"] >= payload["timing"]["fit_seconds"]
+    assert set(payload["timing"]["candidates"]) == {
+        "elastic_net",
+        "random_forest",
+        "hist_gradient_boosting",
+    }
+
+
+def test_fit_candidates_stay_within_job_budget(monkeypatch, training_main) -> None:
+    import threading
+    import time
+
+    from sklearn.linear_model import LinearRegression
+    from sklearn.pipeline import Pipeline
+
+    import training.train as train
+
+    lock = threading.Lock()
+    active = {"jobs": 0, "peak": 0}
+
+    def fake_fit_model(name, pipeline, params, X, y, n_jobs, **kwargs):
+        with lock:
+            active["jobs"] += n_jobs
+            active["peak"] = max(active["peak"], active["jobs"])
+        time.sleep(0.05)
+        with lock:
+            active["jobs"] -= n_jobs
+        return {"name": name, "n_jobs": n_jobs}
+
+    monkeypatch.setattr(train, "_fit_model", fake_fit_model)
+    specs = [
+        {"name": name, "pipeline": Pipeline([("model", LinearRegression())]), "params": {}}
+        | {"heavy": heavy}
+        for name, heavy in [("linear", False), ("forest", True), ("boosting", True)]
+    ]
+    results = train._fit_candidates(specs, None, None, n_jobs=2, strategy="search")
+    assert [result["name"] for result in results] == ["linear", "forest", "boosting"]
+    assert active["peak"] <= 2
+
+
+@pytest.mark.parametrize("search", ["halving", "random"])
+def test_training_search_modes_record_compute(
+    tmp_path: Path, monkeypatch, training_main, search: str
+) -> None:
+    import json
+
+    main = training_main
+    data_path = tmp_path / "processed_data.csv"
+    rows = ["trip_duration,trip_distance,passenger_count"]
+    rows += [f"{300 + 90 * i},{0.5 + 0.4 * i},{1 + i % 3}" for i in range(40)]
+    data_path.write_text("\n".join(rows) + "\n")
+
+    monkeypatch.chdir(tmp_path)
+    exit_code = main(
+        ["--data", str(data_path), "--metrics-out", "metrics.json", "--search", search]
+    )
+
+    assert exit_code == 0
+    payload = json.loads((tmp_path / "metrics.json").read_text())
+    assert payload["search"]["strategy"] == search
+    for compute in payload["search"]["candidates"].values():
+        assert compute["fits"] >= 1
+        assert compute["sample_fits"] >= 1
+    if search == "halving":
+        assert "n_resources" in payload["search"]["candidates"]["random_forest"]
+
+
+def test_elastic_path_matches_grid_search(training_main) -> None:
+    import numpy as np
+    import pandas as pd
+    from sklearn.linear_model import ElasticNet
+    from sklearn.model_selection import GridSearchCV
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    from training.train import _fit_elastic_path
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(600, 3)), columns=["a", "b", "c"])
+    y = 120 * X["a"] - 40 * X["b"] + rng.normal(0, 20, 600) + 800
+    grid = {"model__alpha": [0.01, 1.0, 10.0], "model__l1_ratio": [0.1, 0.9]}
+    pipeline = Pipeline([("scaler", StandardScaler()), ("model", ElasticNet(max_iter=5000))])
+
+    expected = GridSearchCV(pipeline, grid, cv=3, scoring="neg_mean_absolute_error").fit(X, y)
+    estimator, params, compute = _fit_elastic_path(pipeline, grid, X, y, cv=3)
+
+    assert params == expected.best_params_
+    assert np.allclose(
+        estimator.named_steps["model"].coef_,
+        expected.best_estimator_.named_steps["model"].coef_,
+    )
+    assert compute["fits"] == 6
+
+
+def test_training_pipeline_cache_dir(tmp_path: Path, monkeypatch, training_main) -> None:
+    main = training_main
+    data_path = tmp_path / "processed_data.csv"
+    rows = ["trip_duration,trip_distance,passenger_count"]
+    rows += [f"{300 + 90 * i},{0.5 + 0.4 * i},{1 + i % 3}" for i in range(20)]
+    data_path.write_text("\n".join(rows) + "\n")
+
+    monkeypatch.chdir(tmp_path)
+    exit_code = main(
+        [
+            "--data",
+            str(data_path),
+            "--metrics-out",
+            "metrics.json",
+            "--search",
+            "random",
+            "--pipeline-cache",
+            "cache",
+        ]
+    )
+
+    assert exit_code == 0
+    assert any((tmp_path / "cache").rglob("*"))
+
+
+def test_hist_gb_pipeline_encodes_location_ids(tmp_path: Path, monkeypatch, training_main) -> None:
+    import json
+
+    import numpy as np
+
+    from training.train import _build_hist_gb_pipeline
+
+    features = ["trip_distance", "PULocationID", "DOLocationID"]
+    rng = np.random.default_rng(0)
+    X = np.column_stack(
+        [rng.uniform(0, 10, 400), rng.integers(1, 266, 400), rng.integers(1, 266, 400)]
+    )
+    y = X[:, 0] * 60 + (X[:, 1] % 7)
+    pipeline = _build_hist_gb_pipeline(features, random_state=0)
+    pipeline.set_params(model__max_iter=10)
+    pipeline.fit(X, y)
+    assert pipeline.named_steps["model"].is_categorical_.tolist() == [True, True, False]
+    assert pipeline.predict(np.array([[3.0, 999.0, 1.0]])).shape == (1,)
+
+    data_path = tmp_path / "processed_data.csv"
+    data_path.write_text(
+        "trip_duration,trip_distance,passenger_count\n"
+        "600,2.5,1\n900,5.0,2\n300,1.0,1\n450,1.8,1\n1200,7.5,3\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    assert training_main(["--data", str(data_path), "--metrics-out", "metrics.json"]) == 0
+    payload = json.loads((tmp_path / "metrics.json").read_text())
+    report = payload["candidates"]["hist_gradient_boosting"]
+    assert report["size_bytes"] > 0
+    assert report["predict_single_ms_p50"] > 0
+    assert set(payload["candidates"]) == set(payload["timing"]["candidates"])
+
+
+def test_training_selection_policy(tmp_path: Path, monkeypatch, training_main) -> None:
+    import json
+
+    from training.train import _policy_violations, _select_candidate
+
+    policy = {"max_latency_ms": 1.0, "max_size_mb": 1.0}
+    report = {
+        "fast": {"test_mae": 10.0, "predict_single_ms_p99": 0.1, "size_bytes": 1000},
+        "slow": {"test_mae": 5.0, "predict_single_ms_p99": 40.0, "size_bytes": 1000},
+        "big": {"test_mae": 4.0, "predict_single_ms_p99": 0.1, "size_bytes": 2 * 1024**2},
+    }
+    for entry in report.values():
+        entry["violations"] = _policy_violations(entry, policy)
+    assert report["slow"]["violations"] == ["latency"]
+    assert report["big"]["violations"] == ["size"]
+    assert _select_candidate(report, policy) == ("fast", False)
+    for entry in report.values():
+        entry["violations"] = ["latency"]
+    assert _select_candidate(report, policy) == ("big", True)
+
+    data_path = tmp_path / "processed_data.csv"
+    data_path.write_text(
+        "trip_duration,trip_distance,passenger_count\n"
+        "600,2.5,1\n900,5.0,2\n300,1.0,1\n450,1.8,1\n1200,7.5,3\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    exit_code = training_main(
+        ["--data", str(data_path), "--metrics-out", "metrics.json", "--max-size-mb", "0.01"]
+    )
+    assert exit_code == 0
+    payload = json.loads((tmp_path / "metrics.json").read_text())
+    assert payload["selection"]["policy"] == {"max_latency_ms": None, "max_size_mb": 0.01}
+    assert payload["model_type"] == payload["selection"]["selected"] == "elastic_net"
+    assert "size" in payload["candidates"]["random_forest"]["violations"]
+    for key in ("load_ms", "predict_single_ms_p99", "predict_batch_ms_p99"):
+        assert payload["candidates"]["elastic_net"][key] >= 0
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture()
+def streaming_deps():
+    pytest.require_optional("numpy", "pandas", "sklearn", "pyarrow")
+    import numpy as np
+    import pandas as pd
+
+    from training import streaming
+    from training.train import main
+
+    return np, pd, streaming, main
+
+
+def _synthetic_frame(np, pd, rows: int = 500):
+    rng = np.random.default_rng(0)
+    distance = rng.uniform(0.5, 15.0, rows)
+    passengers = rng.integers(1, 5, rows)
+    duration = 120 + distance * 180 + rng.normal(0, 30, rows)
+    return pd.DataFrame(
+        {
+            "trip_distance": distance,
+            "passenger_count": passengers,
+            "trip_duration": duration,
+        }
+    )
+
+
+def test_hash_split_is_chunk_invariant(streaming_deps) -> None:
+    np, pd, streaming, _ = streaming_deps
+    df = _synthetic_frame(np, pd)
+
+    whole = streaming.hash_split(df, 0.2, 42)
+    chunked = np.concatenate(
+        [streaming.hash_split(df.iloc[i : i + 64], 0.2, 42) for i in range(0, len(df), 64)]
+    )
+    assert (whole == chunked).all()
+    assert 0.1 < whole.mean() < 0.3
+    assert not (whole == streaming.hash_split(df, 0.2, 7)).all()
+
+
+def test_streaming_metrics_match_sklearn(streaming_deps) -> None:
+    np, pd, streaming, _ = streaming_deps
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    rng = np.random.default_rng(1)
+    y_true = rng.normal(800, 200, 1000)
+    y_pred = y_true + rng.normal(0, 50, 1000)
+    metrics = streaming.StreamingMetrics()
+    for start in range(0, 1000, 137):
+        metrics.update(y_true[start : start + 137], y_pred[start : start + 137])
+
+    result = metrics.result()
+    assert result["mae"] == pytest.approx(mean_absolute_error(y_true, y_pred))
+    assert result["rmse"] == pytest.approx(mean_squared_error(y_true, y_pred) ** 0.5)
+    assert result["r2"] == pytest.approx(r2_score(y_true, y_pred))
+    assert result["samples"] == 1000
+
+
+@pytest.mark.parametrize("suffix", ["parquet", "csv"])
+def test_streaming_training_writes_artifacts(
+    tmp_path: Path, monkeypatch, streaming_deps, suffix: str
+) -> None:
+    np, pd, _, main = streaming_deps
+    df = _synthetic_frame(np, pd)
+    data_path = tmp_path / f"processed_data.{suffix}"
+    if suffix == "parquet":
+        df.to_parquet(data_path, index=False, row_group_size=100)
+    else:
+        df.to_csv(data_path, index=False)
+
+    monkeypatch.chdir(tmp_path)
+    exit_code = main(
+        [
+            "--data",
+            str(data_path),
+            "--metrics-out",
+            "metrics.json",
+            "--streaming",
+            "--batch-size",
+            "64",
+            "--epochs",
+            "5",
+        ]
+    )
+
+    assert exit_code == 0
+    payload = json.loads((tmp_path / "metrics.json").read_text())
+    assert payload["model_type"] == "sgd_streaming"
+    assert payload["samples"]["train"] + payload["samples"]["test"] == len(df)
+    assert payload["metrics"]["test"]["r2"] > 0.9
+    assert payload["streaming"]["peak_rss_mb"] > 0
+    assert (tmp_path / "models" / "model.joblib").exists()